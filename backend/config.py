@@ -10,11 +10,51 @@ if _env_path.exists():
         pass 
 
 class Config:
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "groq").strip().lower()
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "").strip()
     GROQ_URL: str = os.getenv("GROQ_URL", "").strip()
+    # Offline stub LLM (LLM_PROVIDER=stub): simulated latency and answer length
+    STUB_TTFT_MS: float = float(os.getenv("STUB_TTFT_MS", "300"))
+    STUB_TOKENS_PER_SEC: float = float(os.getenv("STUB_TOKENS_PER_SEC", "200"))
+    STUB_OUTPUT_TOKENS: int = int(os.getenv("STUB_OUTPUT_TOKENS", "120"))
     SMALL_MODEL: str = "llama-3.1-8b-instant"
     BIG_MODEL: str = "llama-3.3-70b-versatile"
+    EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     TOP_K: int = 10
+    # Index vector storage: "float32" (exact), "float16", or "int8" (FAISS scalar quantizer); see scripts/compare_storage.py
+    EMBEDDING_STORAGE: str = os.getenv("EMBEDDING_STORAGE", "float32").strip().lower()
     CHUNK_SIZE: int = 600
     CHUNK_OVERLAP: int = 100
-    PORT: int = int(os.getenv("PORT"))
\ No newline at end of file
+    # "rules" (RuleBasedRouter) or "embedding" (EmbeddingRouter, trained by scripts/train_router.py)
+    ROUTER: str = os.getenv("ROUTER", "rules").strip().lower()
+    ROUTER_MODEL_PATH: str = os.getenv("ROUTER_MODEL_PATH", str(Path(__file__).resolve().parent / "routing" / "router_model.npz"))
+    ROUTER_COMPLEX_THRESHOLD: float = float(os.getenv("ROUTER_COMPLEX_THRESHOLD", "0.5"))
+    # Embedding grounding check: flags answer sentences whose best chunk similarity is below the threshold.
+    # Off by default: calibrate the threshold with scripts/calibrate_grounding.py before enabling it.
+    GROUNDING_ENABLED: bool = os.getenv("GROUNDING_ENABLED", "false").strip().lower() in ("1", "true", "yes")
+    GROUNDING_THRESHOLD: float = float(os.getenv("GROUNDING_THRESHOLD", "0.4"))
+    # Most streamed answers waiting for (or in) their background grounding check; further ones go ungraded
+    GROUNDING_QUEUE_MAX: int = int(os.getenv("GROUNDING_QUEUE_MAX", "32"))
+    # Optional JSON file of extra keyword lists ("simple", "complex", "refusal") for the router and evaluator
+    KEYWORDS_PATH: str = os.getenv("KEYWORDS_PATH", "").strip()
+    # How often (seconds) a running server checks KEYWORDS_PATH for edits; 0 disables reloading
+    KEYWORDS_RELOAD_SECONDS: float = float(os.getenv("KEYWORDS_RELOAD_SECONDS", "5"))
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", "1000"))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "4"))
+    # Persisted FAISS index + chunks, keyed by corpus version; memory-mapped read-only when MMAP_INDEX is on
+    INDEX_DIR: str = os.getenv("INDEX_DIR", str(Path(__file__).resolve().parent / "index_cache"))
+    # Cache hits on /query/stream: 0 sends the cached frames in one write; otherwise replay at this many chunks/second
+    CACHE_REPLAY_CHUNKS_PER_SEC: float = float(os.getenv("CACHE_REPLAY_CHUNKS_PER_SEC", "0"))
+    # Tenant corpora: PDFs in TENANTS_DIR/<tenant_id>/, loaded on first query; at most this many indexes stay resident
+    TENANTS_DIR: str = os.getenv("TENANTS_DIR", str(Path(__file__).resolve().parent.parent / "tenants"))
+    MAX_RESIDENT_TENANTS: int = int(os.getenv("MAX_RESIDENT_TENANTS", "8"))
+    # Bearer token for GET /metrics/tenants; empty disables the endpoint
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "").strip()
+    # Precomputed FAQ answers (scripts/warm_cache.py) loaded into the cache at startup; empty disables
+    ANSWER_STORE_DIR: str = os.getenv("ANSWER_STORE_DIR", str(Path(__file__).resolve().parent / "answer_store"))
+    MMAP_INDEX: bool = os.getenv("MMAP_INDEX", "true").strip().lower() in ("1", "true", "yes")
+    # Load the model and index at import time (pre-fork mode, see gunicorn.conf.py) instead of in the background
+    PRELOAD_INDEX: bool = os.getenv("PRELOAD_INDEX", "").strip().lower() in ("1", "true", "yes")
+    # Torch/FAISS threads per process; 0 leaves the library default (all cores)
+    TORCH_THREADS: int = int(os.getenv("TORCH_THREADS", "0"))
+    PORT: int = int(os.getenv("PORT", "8000"))
\ No newline at end of file
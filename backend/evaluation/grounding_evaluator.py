@@ -0,0 +1,98 @@
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import Config
+from evaluation.evaluator_interface import Evaluator
+from models import GroundingReport, GroundingSource
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+
+class GroundingEvaluator(Evaluator):
+    """
+    Checks that each answer sentence is supported by some retrieved chunk.
+
+    Sentences are embedded in one batch and compared to the chunk vectors that
+    retrieval attached to the chunks (chunk["embedding"]; nothing is re-encoded)
+    with one similarity matmul. Sentences whose best cosine similarity is below
+    the threshold are reported as unsupported; supported sentences are attributed
+    to the document/page of their best chunk.
+    """
+
+    # Greetings, headings, and fragments carry no claims worth checking.
+    MIN_SENTENCE_WORDS = 4
+
+    def __init__(self, encode: Callable[[List[str]], np.ndarray], threshold: Optional[float] = None):
+        self.encode = encode
+        self.threshold = Config.GROUNDING_THRESHOLD if threshold is None else threshold
+
+    def split_sentences(self, answer: str) -> List[str]:
+        sentences = []
+        for part in _SENTENCE_SPLIT.split(answer):
+            sentence = _LIST_MARKER.sub("", part).strip()
+            if len(sentence.split()) >= self.MIN_SENTENCE_WORDS:
+                sentences.append(sentence)
+        return sentences
+
+    def check(self, answer: str, retrieved_chunks: List[Dict]) -> Optional[GroundingReport]:
+        """Grounding report for the answer, or None when there is nothing to check against."""
+        start_time = time.perf_counter()
+        chunks = [c for c in retrieved_chunks if c.get("embedding") is not None]
+        sentences = self.split_sentences(answer)
+        if not chunks or not sentences:
+            return None
+
+        similarity = self._similarity(sentences, chunks)
+        best_chunk = similarity.argmax(axis=1)
+        best_score = similarity.max(axis=1)
+        supported = best_score >= self.threshold
+
+        attribution: Dict[Tuple[str, Optional[int]], GroundingSource] = {}
+        for i in np.flatnonzero(supported):
+            chunk = chunks[best_chunk[i]]
+            key = (chunk["document"], chunk.get("page"))
+            source = attribution.setdefault(
+                key, GroundingSource(document=key[0], page=key[1], sentences=0, max_similarity=0.0)
+            )
+            source.sentences += 1
+            source.max_similarity = max(source.max_similarity, round(float(best_score[i]), 4))
+
+        return GroundingReport(
+            sentences_checked=len(sentences),
+            grounded_ratio=round(float(supported.mean()), 4),
+            unsupported_sentences=[s for s, ok in zip(sentences, supported) if not ok],
+            attribution=sorted(attribution.values(), key=lambda s: -s.sentences),
+            cost_ms=round((time.perf_counter() - start_time) * 1000, 2),
+        )
+
+    def sentence_scores(self, answer: str, retrieved_chunks: List[Dict]) -> List[Tuple[str, float]]:
+        """Each checked sentence with its best chunk similarity (scripts/calibrate_grounding.py)."""
+        chunks = [c for c in retrieved_chunks if c.get("embedding") is not None]
+        sentences = self.split_sentences(answer)
+        if not chunks or not sentences:
+            return []
+        best_score = self._similarity(sentences, chunks).max(axis=1)
+        return [(s, float(score)) for s, score in zip(sentences, best_score)]
+
+    def _similarity(self, sentences: List[str], chunks: List[Dict]) -> np.ndarray:
+        sentence_vectors = _normalize(np.asarray(self.encode(sentences), dtype=np.float32))
+        chunk_vectors = _normalize(np.stack([c["embedding"] for c in chunks]).astype(np.float32))
+        return sentence_vectors @ chunk_vectors.T
+
+    def evaluate(
+        self,
+        answer: str,
+        retrieved_chunks: List[Dict]
+    ) -> List[str]:
+        report = self.check(answer, retrieved_chunks)
+        return ["ungrounded"] if report and report.unsupported_sentences else []
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
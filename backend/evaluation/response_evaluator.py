@@ -1,5 +1,7 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from config import Config
 from evaluation.evaluator_interface import Evaluator
+from keyword_matcher import KeywordFileWatcher, KeywordMatcher, load_keyword_file
 
 class ResponseEvaluator(Evaluator):
     """
@@ -16,6 +18,22 @@ class ResponseEvaluator(Evaluator):
         "cannot find",
         "not available in the documentation"
     ]
+    PRICING_KEYWORDS = ["price", "pricing"]
+
+    def __init__(self, keywords_path: Optional[str] = None):
+        # Extra "refusal" phrases from a JSON file are added to the built-in list.
+        self.keywords_path = Config.KEYWORDS_PATH if keywords_path is None else keywords_path
+        # Edits to the file are picked up within KEYWORDS_RELOAD_SECONDS, without a restart.
+        self._watcher = KeywordFileWatcher(self.keywords_path, Config.KEYWORDS_RELOAD_SECONDS)
+        self.reload()
+
+    def reload(self) -> None:
+        """Rebuild the matcher from the built-in lists plus keywords_path. Raises on a bad file; the old matcher stays."""
+        extra = load_keyword_file(self.keywords_path)
+        self._matcher = KeywordMatcher({
+            "refusal": self.REFUSAL_PHRASES + extra.get("refusal", []),
+            "pricing": self.PRICING_KEYWORDS,
+        })
 
     def evaluate(
         self,
@@ -23,25 +41,23 @@ class ResponseEvaluator(Evaluator):
         retrieved_chunks: List[Dict]
     ) -> List[str]:
 
+        self._watcher.poll(self.reload)
         flags = []
-        answer_lower = answer.lower()
+        matched = self._matcher.categories(answer.lower())
+        is_refusal = "refusal" in matched
 
-        if len(retrieved_chunks) == 0 and not any(
-            phrase in answer_lower for phrase in self.REFUSAL_PHRASES
-        ):
+        if len(retrieved_chunks) == 0 and not is_refusal:
             flags.append("no_context")
         elif len(retrieved_chunks) > 0:
             scores = [
                 c.get("relevance_score", 0)
                 for c in retrieved_chunks
             ]
-            if all(s < self.LOW_RELEVANCE_THRESHOLD for s in scores) and not any(
-                phrase in answer_lower for phrase in self.REFUSAL_PHRASES
-            ):
+            if all(s < self.LOW_RELEVANCE_THRESHOLD for s in scores) and not is_refusal:
                 flags.append("no_context")
-        if any(phrase in answer_lower for phrase in self.REFUSAL_PHRASES):
+        if is_refusal:
             flags.append("refusal")
-        if "price" in answer_lower or "pricing" in answer_lower:
+        if "pricing" in matched:
             distinct_docs = {c.get("document") for c in retrieved_chunks if c.get("document")}
             if len(distinct_docs) > 1:
                 flags.append("multiple_conflicting_sources")
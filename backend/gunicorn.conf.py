@@ -0,0 +1,50 @@
+"""
+Gunicorn config for the pre-fork multi-worker deployment:
+
+    cd backend && WEB_CONCURRENCY=4 gunicorn -c gunicorn.conf.py main:app
+
+The app is imported once in the master with PRELOAD_INDEX=1, so the embedding
+model and chunk list are loaded before the workers fork and are shared
+copy-on-write; the FAISS index is memory-mapped read-only from INDEX_DIR.
+Torch/BLAS/FAISS thread pools are sized to cores // workers so N workers do not
+oversubscribe the CPU.
+
+The master runs torch and FAISS single-threaded while it builds the index and
+warms up, so no OpenMP thread pool exists at fork time (a GNU OpenMP pool
+created before fork can hang the first parallel region in the children).
+Each worker sizes its own pools in post_fork.
+"""
+
+import gc
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+preload_app = True
+# Workers are forked from an already-loaded master, so they boot quickly; the long
+# timeout only covers slow LLM calls on sync paths.
+timeout = 120
+
+_threads = int(os.getenv("TORCH_THREADS", "0")) or max(1, (os.cpu_count() or 1) // workers)
+
+# These must be set before the app imports torch, numpy, or faiss.
+os.environ["PRELOAD_INDEX"] = "1"
+os.environ["TORCH_THREADS"] = "1"
+for _var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_var, str(_threads))
+
+
+def post_fork(server, worker):
+    import faiss
+    import torch
+
+    torch.set_num_threads(_threads)
+    faiss.omp_set_num_threads(_threads)
+
+
+def when_ready(server):
+    # The app is loaded; move its objects out of the collector's generations so GC
+    # passes in the workers do not write to (and un-share) those pages.
+    gc.freeze()
+    server.log.info("Pre-fork app loaded; %d workers x %d threads", workers, _threads)
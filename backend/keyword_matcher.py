@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword from several named lists in a single pass over the text.
+
+    Keywords are compiled into one trie-shaped regex, so the scan follows at most
+    one path through the trie per text position instead of re-scanning the text
+    once per keyword. Matching is plain substring matching, the same as
+    `keyword in text`: callers lowercase the text, and keywords are lowercased here.
+
+    CPython's `in` is fast enough that a few dozen separate scans still beat the
+    regex, so sets up to SCAN_THRESHOLD keywords are checked that way
+    (see `scripts/run_benchmarks.py --only keywords`).
+    """
+
+    SCAN_THRESHOLD = 32
+
+    def __init__(self, keyword_lists: Dict[str, Iterable[str]]):
+        self._categories: Dict[str, Set[str]] = {}
+        for category, keywords in keyword_lists.items():
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                if keyword:
+                    self._categories.setdefault(keyword, set()).add(category)
+
+        # The regex reports only the longest keyword starting at each position; every
+        # other keyword starting there is a prefix of it, so precompute those.
+        self._implied: Dict[str, List[str]] = {
+            keyword: [k for k in self._categories if keyword.startswith(k)]
+            for keyword in self._categories
+        }
+
+        trie: Dict = {}
+        for keyword in self._categories:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self._pattern = None
+        if len(self._categories) > self.SCAN_THRESHOLD:
+            self._pattern = re.compile(self._trie_pattern(trie))
+
+    @classmethod
+    def _trie_pattern(cls, node: Dict) -> str:
+        branches = [re.escape(ch) + cls._trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: prefer the longer keyword, fall back to the one ending here.
+        return f"(?:{body})?" if "" in node else body
+
+    def find_all(self, text: str) -> Set[str]:
+        """Every keyword that occurs in text, overlapping occurrences included."""
+        if self._pattern is None:
+            return {keyword for keyword in self._categories if keyword in text}
+        found: Set[str] = set()
+        match = self._pattern.search(text)
+        while match:
+            found.update(self._implied[match.group()])
+            # Resume one character in, not at the match end, so overlapping keywords are found too.
+            match = self._pattern.search(text, match.start() + 1)
+        return found
+
+    def categories(self, text: str) -> Set[str]:
+        """Names of the keyword lists with at least one keyword in text."""
+        found: Set[str] = set()
+        for keyword in self.find_all(text):
+            found |= self._categories[keyword]
+        return found
+
+
+class KeywordFileWatcher:
+    """
+    Notices edits to a keyword file by its mtime, checked at most once per interval,
+    so callers can poll it on every request. Each process (e.g. each gunicorn worker)
+    picks up the edit on its own; nothing has to be signalled.
+    """
+
+    def __init__(self, path: str, interval: float):
+        self.path = path
+        self.interval = interval
+        self._mtime = self._stat()
+        self._next_check = time.monotonic() + interval
+
+    def _stat(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def poll(self, reload: Callable[[], None]) -> None:
+        """Call reload() if the file changed since the last check. A failed reload is logged, not raised."""
+        if not self.path or self.interval <= 0:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.interval
+        mtime = self._stat()
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        try:
+            reload()
+            logging.getLogger(__name__).info("Reloaded keyword lists from %s", self.path)
+        except Exception:
+            logging.getLogger(__name__).exception("Could not reload %s; keeping the previous keyword lists", self.path)
+
+
+def load_keyword_file(path: str) -> Dict[str, List[str]]:
+    """Read extra keyword lists from a JSON object of list name -> phrases. Empty path means none."""
+    if not path:
+        return {}
+    with open(path, "r") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(
+        isinstance(v, list) and all(isinstance(k, str) for k in v) for v in data.values()
+    ):
+        raise ValueError(f"{path} must be a JSON object mapping list names to arrays of strings")
+    return data
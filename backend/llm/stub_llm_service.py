@@ -0,0 +1,80 @@
+import hashlib
+import random
+import time
+from typing import Iterator, List, Tuple
+
+from llm.llm_interface import LLMService
+
+
+# Used when no context was retrieved, so answers are still non-empty and deterministic.
+_FALLBACK_WORDS = (
+    "ClearPath documentation support project task workflow plan team settings "
+    "integration report dashboard account user guide feature"
+).split()
+
+
+class StubLLMService(LLMService):
+    """
+    Offline, deterministic stand-in for GroqLLMService.
+
+    The answer is drawn from the retrieved context with an RNG seeded by the request,
+    so the same (model, question, context) always produces the same text and token
+    counts. Latency is simulated: time-to-first-token, then one token per
+    1 / tokens_per_sec seconds. Set both to 0 for pure CPU microbenchmarks.
+    """
+
+    def __init__(self, ttft_ms: float = 300.0, tokens_per_sec: float = 200.0, output_tokens: int = 120):
+        self.ttft_ms = ttft_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.output_tokens = output_tokens
+
+    def _answer_tokens(self, model: str, context: str, question: str, classification: str) -> List[str]:
+        seed = hashlib.sha256(f"{model}\x00{question}\x00{context}".encode("utf-8")).digest()
+        rng = random.Random(seed)
+        vocabulary = context.split() or _FALLBACK_WORDS
+        count = self.output_tokens * 2 if classification == "complex" else self.output_tokens
+        return [rng.choice(vocabulary) for _ in range(max(count, 1))]
+
+    def _input_tokens(self, context: str, question: str, history: List[dict] | None) -> int:
+        # Rough 4-chars-per-token estimate plus a fixed allowance for the system prompt.
+        history_chars = sum(len(m["content"]) for m in history) if history else 0
+        return 250 + (len(context) + len(question) + history_chars) // 4
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    def generate(
+        self,
+        model: str,
+        context: str,
+        question: str,
+        classification: str = "simple",
+        history: List[dict] | None = None,
+    ) -> Tuple[str, int, int]:
+
+        tokens = self._answer_tokens(model, context, question, classification)
+        delay = self.ttft_ms / 1000 + self._token_delay() * len(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+        return " ".join(tokens), self._input_tokens(context, question, history), len(tokens)
+
+    def generate_stream(
+        self,
+        model: str,
+        context: str,
+        question: str,
+        classification: str = "simple",
+        history: List[dict] | None = None,
+    ) -> Iterator[Tuple[str, int, int]]:
+        """Stream the deterministic answer one token at a time. Final yield is ("", input_tokens, output_tokens)."""
+        tokens = self._answer_tokens(model, context, question, classification)
+        if self.ttft_ms > 0:
+            time.sleep(self.ttft_ms / 1000)
+
+        delay = self._token_delay()
+        for i, token in enumerate(tokens):
+            if i and delay:
+                time.sleep(delay)
+            yield (token if i == 0 else " " + token), 0, 0
+        yield "", self._input_tokens(context, question, history), len(tokens)
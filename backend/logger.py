@@ -1,5 +1,14 @@
 import json
 import os
+from typing import List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; fine for the single-process dev server
+    fcntl = None
+
+from config import Config
+from models import DEFAULT_TENANT, tenant_key
 
 
 class RoutingLogger:
@@ -25,7 +34,12 @@ class RoutingLogger:
         model_used: str,
         tokens_input: int,
         tokens_output: int,
-        latency_ms: int
+        latency_ms: int,
+        predicted_latency_ms: Optional[int] = None,
+        predicted_latency_saved_ms: Optional[int] = None,
+        predicted_tokens_saved: Optional[int] = None,
+        tenant_id: Optional[str] = None,
+        evaluator_flags: Optional[List[str]] = None,
     ) -> None:
 
         log_entry = {
@@ -35,16 +49,40 @@ class RoutingLogger:
             "tokens_input": tokens_input,
             "tokens_output": tokens_output,
             "latency_ms": latency_ms,
+            # Stub-LLM traffic (offline mode, load benchmarks) must not be mined as real answers
+            "llm_provider": Config.LLM_PROVIDER,
         }
+        # Router estimates (EmbeddingRouter only); omitted when the router makes none
+        for key, value in (
+            ("predicted_latency_ms", predicted_latency_ms),
+            ("predicted_latency_saved_ms", predicted_latency_saved_ms),
+            ("predicted_tokens_saved", predicted_tokens_saved),
+        ):
+            if value is not None:
+                log_entry[key] = value
+        # Outcome signal for scripts/train_router.py
+        if evaluator_flags is not None:
+            log_entry["evaluator_flags"] = evaluator_flags
+        # Default-corpus entries carry no tenant_id, however the request spelled it.
+        if tenant_key(tenant_id) != DEFAULT_TENANT:
+            log_entry["tenant_id"] = tenant_id
 
-        try:
-            with open(self.log_file, "r") as f:
-                content = f.read().strip()
-                logs = json.loads(content) if content else []
-        except (json.JSONDecodeError, FileNotFoundError):
-            logs = []
+        # Gunicorn workers share this file. The read-modify-write holds an exclusive lock so one
+        # worker never reads another's half-written file (and overwrites the history with [] plus
+        # its entry), and the new file is swapped in whole so unlocked readers never see it partial.
+        with open(self.log_file + ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                with open(self.log_file, "r") as f:
+                    content = f.read().strip()
+                    logs = json.loads(content) if content else []
+            except (json.JSONDecodeError, FileNotFoundError):
+                logs = []
 
-        logs.append(log_entry)
+            logs.append(log_entry)
 
-        with open(self.log_file, "w") as f:
-            json.dump(logs, f, indent=2)
\ No newline at end of file
+            tmp_file = f"{self.log_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w") as f:
+                json.dump(logs, f, indent=2)
+            os.replace(tmp_file, self.log_file)
\ No newline at end of file
@@ -1,25 +1,67 @@
+import hmac
+import logging
+import threading
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Optional
 
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from models import QueryRequest, QueryResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from models import BatchQueryRequest, QueryRequest, QueryResponse
 from config import Config
 
 DOCS_PATH = Path(__file__).resolve().parent.parent / "clearpath_docs"
 
+from services.answer_store import AnswerStore
 from services.cache_service import CacheService
 from services.conversation_store import ConversationStore
 from services.query_service import QueryService
 from routing.RuleBasedRouter import RuleBasedRouter
+from routing.EmbeddingRouter import EmbeddingRouter
 from rag.retrieval_service import RetrievalService
+from rag.tenant_registry import TenantRegistry
 from llm.groq_llm_service import GroqLLMService
+from llm.stub_llm_service import StubLLMService
+from evaluation.grounding_evaluator import GroundingEvaluator
 from evaluation.response_evaluator import ResponseEvaluator
 from logger import RoutingLogger
 
 
-app = FastAPI(title="ClearPath Chatbot API")
+def _load_retriever() -> None:
+    try:
+        retriever.load()
+        logging.getLogger(__name__).info(
+            "Retriever ready: %d vectors in %d ms", retriever.index_size, retriever.load_ms
+        )
+    except Exception:
+        logging.getLogger(__name__).exception("Retriever failed to load")
+        return
+    _warm_cache()
+
+
+def _warm_cache() -> None:
+    # Precomputed answers are keyed by corpus version, which is known once the index has loaded.
+    try:
+        warmed = cache_service.warm(answer_store.load(retriever.corpus_version))
+        if warmed:
+            logging.getLogger(__name__).info("Cache warmed with %d precomputed answers", warmed)
+    except Exception:
+        logging.getLogger(__name__).exception("Failed to load precomputed answers; starting with an empty cache")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model and index in the background so the port opens immediately;
+    # /ready and the query endpoints report 503 until loading finishes.
+    # In pre-fork mode the master has already loaded them before forking this worker.
+    if retriever.phase == "pending":
+        threading.Thread(target=_load_retriever, name="retriever-load", daemon=True).start()
+    yield
+
+
+app = FastAPI(title="ClearPath Chatbot API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,21 +69,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
+    # The frontend waits Retry-After seconds and retries queries sent while the index is loading.
+    expose_headers=["Retry-After"],
 )
 
 
 
-if not Config.GROQ_API_KEY:
-    raise ValueError(
-        "GROQ_API_KEY is not set. Add it to .env in the project root, e.g. GROQ_API_KEY=gsk_..."
+if Config.LLM_PROVIDER == "stub":
+    llm_service = StubLLMService(
+        ttft_ms=Config.STUB_TTFT_MS,
+        tokens_per_sec=Config.STUB_TOKENS_PER_SEC,
+        output_tokens=Config.STUB_OUTPUT_TOKENS,
     )
+elif Config.LLM_PROVIDER == "groq":
+    if not Config.GROQ_API_KEY:
+        raise ValueError(
+            "GROQ_API_KEY is not set. Add it to .env in the project root, e.g. GROQ_API_KEY=gsk_..."
+        )
+    llm_service = GroqLLMService(api_key=Config.GROQ_API_KEY)
+else:
+    raise ValueError(f"Unknown LLM_PROVIDER {Config.LLM_PROVIDER!r}; expected 'groq' or 'stub'.")
 
 cache_service = CacheService()
+answer_store = AnswerStore()
 conversation_store = ConversationStore()
-router = RuleBasedRouter()
-retriever = RetrievalService(docs_path=str(DOCS_PATH))
-llm_service = GroqLLMService(api_key=Config.GROQ_API_KEY)
+router = EmbeddingRouter() if Config.ROUTER == "embedding" else RuleBasedRouter()
+retriever = RetrievalService(docs_path=str(DOCS_PATH), autoload=False)
+if Config.PRELOAD_INDEX:
+    # Pre-fork mode: load once in the gunicorn master so forked workers share the pages.
+    retriever.load()
+    _warm_cache()
+tenants = TenantRegistry(default=retriever)
 evaluator = ResponseEvaluator()
+grounding = GroundingEvaluator(encode=retriever.encode) if Config.GROUNDING_ENABLED else None
 logger = RoutingLogger()
 
 query_service = QueryService(
@@ -52,26 +112,87 @@ query_service = QueryService(
     cache=cache_service,
     conversation_store=conversation_store,
     logger=logger,
+    grounding=grounding,
+    tenants=tenants,
 )
 
 
 
-@app.post("/query", response_model=QueryResponse)
+def require_ready() -> None:
+    if retriever.phase == "failed":
+        raise HTTPException(status_code=503, detail="Document index failed to load; see server logs.")
+    if not retriever.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service is starting up (phase: {retriever.phase}). Retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+
+def require_tenant(tenant_id: Optional[str]) -> None:
+    # Checked before streaming starts, so an unknown tenant is a 404 rather than an error event.
+    if not tenants.exists(tenant_id):
+        raise HTTPException(status_code=404, detail=f"Unknown tenant {tenant_id!r}.")
+
+
+@app.post("/query", response_model=QueryResponse, dependencies=[Depends(require_ready)])
 def query_endpoint(request: QueryRequest):
+    require_tenant(request.tenant_id)
     return query_service.handle_query(request)
 
 
-@app.post("/query/stream")
+@app.post("/query/stream", dependencies=[Depends(require_ready)])
 def query_stream_endpoint(request: QueryRequest):
+    require_tenant(request.tenant_id)
     return StreamingResponse(
         query_service.handle_query_stream(request),
         media_type="text/event-stream",
         headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+@app.post("/query/batch", dependencies=[Depends(require_ready)])
+def query_batch_endpoint(request: BatchQueryRequest):
+    require_tenant(request.tenant_id)
+    return StreamingResponse(
+        query_service.handle_batch(request),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/health")
 def health_endpoint():
+    # Liveness only: the process is up and serving HTTP. Use /ready for traffic decisions.
     return {"status": "ok"}
 
+
+@app.get("/ready")
+def ready_endpoint():
+    body = {
+        "status": "ready" if retriever.ready else ("failed" if retriever.phase == "failed" else "loading"),
+        "phase": retriever.phase,
+        "index_size": retriever.index_size,
+        "load_ms": retriever.load_ms,
+    }
+    if retriever.error:
+        body["error"] = retriever.error
+    return JSONResponse(body, status_code=200 if retriever.ready else 503)
+
+
+def require_metrics_token(authorization: Optional[str] = Header(default=None)) -> None:
+    # Tenant names and traffic are operator data: off unless METRICS_TOKEN is set, then bearer-token only.
+    if not Config.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(authorization or "", f"Bearer {Config.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid or missing metrics token.", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/metrics/tenants", dependencies=[Depends(require_metrics_token)])
+def tenant_metrics_endpoint():
+    # Per-tenant query counts, cache hits, mean latency, index loads/evictions, and residency.
+    return tenants.metrics()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
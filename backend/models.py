@@ -1,15 +1,46 @@
 from typing import List, Optional
 from pydantic import BaseModel, ConfigDict, Field
 
+from config import Config
+
+# Tenant ids name directories under TENANTS_DIR, so nothing that could escape it.
+TENANT_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+DEFAULT_TENANT = "default"
+
+
+def tenant_key(tenant_id: Optional[str]) -> str:
+    """The tenant an id refers to: no tenant_id and "default" are both the default corpus."""
+    return tenant_id or DEFAULT_TENANT
+
+
 class QueryRequest(BaseModel):
     question: str
     conversation_id: Optional[str] = None
+    tenant_id: Optional[str] = Field(default=None, pattern=TENANT_ID_PATTERN)
+
+class BatchQueryRequest(BaseModel):
+    questions: List[str] = Field(min_length=1, max_length=Config.BATCH_MAX_SIZE)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+    tenant_id: Optional[str] = Field(default=None, pattern=TENANT_ID_PATTERN)
 
 class TokenUsage(BaseModel):
     model_config = ConfigDict(serialize_by_alias=True)
     input_tokens: int = Field(serialization_alias="input")
     output_tokens: int = Field(serialization_alias="output")
 
+class GroundingSource(BaseModel):
+    document: str
+    page: Optional[int] = None
+    sentences: int
+    max_similarity: float
+
+class GroundingReport(BaseModel):
+    sentences_checked: int
+    grounded_ratio: float
+    unsupported_sentences: List[str]
+    attribution: List[GroundingSource]
+    cost_ms: float
+
 class Metadata(BaseModel):
     model_used: str
     classification: str
@@ -19,6 +50,7 @@ class Metadata(BaseModel):
     evaluator_flags: List[str]
     evaluator_message: Optional[str] = None 
     cache_hit: bool = False  
+    grounding: Optional[GroundingReport] = None
 
 class Source(BaseModel):
     document: str
@@ -1,12 +1,14 @@
+import hashlib
+import json
 import logging
 import os
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional, Tuple
 
 os.environ.setdefault("TRANSFORMERS_VERBOSITY", "error")
 
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from pypdf import PdfReader
 
 from config import Config
@@ -14,6 +16,14 @@ from config import Config
 for _name in ("pypdf", "pypdf._reader"):
     logging.getLogger(_name).setLevel(logging.ERROR)
 
+# Config.EMBEDDING_STORAGE -> FAISS scalar quantizer type (None: exact float32 IndexFlatL2).
+# float16 halves index memory with negligible recall loss; int8 quarters it.
+EMBEDDING_STORAGE_TYPES = {
+    "float32": None,
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
 
 class RetrievalService:
     """
@@ -23,17 +33,156 @@ class RetrievalService:
     - Embedding creation
     - FAISS indexing
     - Query retrieval
+
+    With autoload=False the constructor is cheap and load() does the heavy work,
+    so it can run in a background thread while the server is already accepting
+    connections. `phase` tracks progress for readiness probes.
+
+    The built index and chunk list are persisted under index_dir, keyed by
+    corpus_version (a hash of the PDFs, chunking settings, model, and storage mode). Later loads
+    skip embedding entirely and, with Config.MMAP_INDEX, memory-map the index
+    read-only so every worker process shares one copy through the page cache.
+
+    Passing an already loaded embedding_model (as TenantRegistry does for tenant
+    corpora) skips loading the model again. embedding_storage (default
+    Config.EMBEDDING_STORAGE) picks how vectors are stored in the index.
     """
 
-    def __init__(self, docs_path: str = "docs"):
+    def __init__(
+        self,
+        docs_path: str = "docs",
+        autoload: bool = True,
+        index_dir: Optional[str] = None,
+        embedding_model=None,
+        embedding_storage: Optional[str] = None,
+    ):
         self.docs_path = docs_path
-        self.embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.index_dir = index_dir or Config.INDEX_DIR
+        self.embedding_model = embedding_model
+        self.embedding_storage = embedding_storage or Config.EMBEDDING_STORAGE
+        if self.embedding_storage not in EMBEDDING_STORAGE_TYPES:
+            raise ValueError(
+                f"Unknown embedding storage {self.embedding_storage!r}; expected one of {', '.join(EMBEDDING_STORAGE_TYPES)}"
+            )
 
         self.chunks: List[Dict] = []
         self.index = None
+        self.corpus_version: Optional[str] = None
+
+        self.phase = "pending"
+        self.error: Optional[str] = None
+        self.load_ms: Optional[int] = None
+
+        if autoload:
+            self.load()
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == "ready"
+
+    @property
+    def index_size(self) -> int:
+        return self.index.ntotal if self.index is not None else 0
+
+    def load(self) -> None:
+        """Load the model, chunk the documents, build the index, and warm up. Sets phase to "failed" on error."""
+        start_time = time.time()
+        try:
+            if self.embedding_model is None:
+                self.phase = "loading_model"
+                # Imported here so importing this module (and binding the server port) does not wait on torch.
+                from sentence_transformers import SentenceTransformer
+                self._configure_threads()
+                self.embedding_model = SentenceTransformer(Config.EMBEDDING_MODEL)
+
+            self.phase = "loading_documents"
+            self.corpus_version = self._compute_corpus_version()
+            if not self._load_persisted():
+                self.chunks = []
+                self._load_documents()
+
+                self.phase = "building_index"
+                self._build_index()
+                self._persist()
+
+            self.phase = "warming_up"
+            self._warm_up()
+        except Exception as e:
+            self.phase = "failed"
+            self.error = str(e)
+            raise
+        finally:
+            self.load_ms = int((time.time() - start_time) * 1000)
+
+        self.phase = "ready"
+
+    def _configure_threads(self) -> None:
+        # With several worker processes, each one should use its share of the cores, not all of them.
+        if Config.TORCH_THREADS > 0:
+            import torch
+            torch.set_num_threads(Config.TORCH_THREADS)
+            faiss.omp_set_num_threads(Config.TORCH_THREADS)
+
+    def _compute_corpus_version(self) -> str:
+        settings = f"{Config.EMBEDDING_MODEL}|{Config.CHUNK_SIZE}|{Config.CHUNK_OVERLAP}"
+        if self.embedding_storage != "float32":
+            # Quantized indexes persist separately; float32 keeps the version it had before storage modes existed.
+            settings += f"|{self.embedding_storage}"
+        digest = hashlib.sha256(settings.encode("utf-8"))
+        if os.path.isdir(self.docs_path):
+            for filename in sorted(os.listdir(self.docs_path)):
+                if filename.endswith(".pdf"):
+                    digest.update(filename.encode("utf-8"))
+                    with open(os.path.join(self.docs_path, filename), "rb") as f:
+                        digest.update(f.read())
+        return digest.hexdigest()[:16]
+
+    def _index_paths(self) -> Tuple[str, str]:
+        base = os.path.join(self.index_dir, self.corpus_version)
+        return base + ".faiss", base + ".chunks.json"
 
-        self._load_documents()
-        self._build_index()
+    def _read_index(self, index_path: str):
+        flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY if Config.MMAP_INDEX else 0
+        return faiss.read_index(index_path, flags)
+
+    def _load_persisted(self) -> bool:
+        index_path, chunks_path = self._index_paths()
+        if not (os.path.exists(index_path) and os.path.exists(chunks_path)):
+            return False
+        try:
+            with open(chunks_path, "r") as f:
+                chunks = json.load(f)
+            index = self._read_index(index_path)
+        except Exception:
+            logging.getLogger(__name__).exception("Ignoring unreadable persisted index %s", index_path)
+            return False
+        self.chunks = chunks
+        self.index = index
+        return True
+
+    def _persist(self) -> None:
+        if self.index is None:
+            return
+        index_path, chunks_path = self._index_paths()
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            # Write-then-rename so concurrently starting workers never read a partial file.
+            suffix = f".{os.getpid()}.tmp"
+            with open(chunks_path + suffix, "w") as f:
+                json.dump(self.chunks, f)
+            faiss.write_index(self.index, index_path + suffix)
+            os.replace(chunks_path + suffix, chunks_path)
+            os.replace(index_path + suffix, index_path)
+        except OSError:
+            logging.getLogger(__name__).exception("Could not persist index to %s", self.index_dir)
+            return
+        if Config.MMAP_INDEX:
+            # Swap the private heap copy for the shared, read-only mapping.
+            self.index = self._read_index(index_path)
+
+    def _warm_up(self) -> None:
+        # First encode/search pays one-off costs (kernel selection, lazy allocations); keep them off user requests.
+        self.search(self.encode(["How do I get started with ClearPath?"]))
 
 
     def _load_documents(self):
@@ -83,28 +232,59 @@ class RetrievalService:
         embeddings = self.embedding_model.encode(texts, convert_to_numpy=True)
 
         dimension = embeddings.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)
+        quantizer_type = EMBEDDING_STORAGE_TYPES[self.embedding_storage]
+        if quantizer_type is None:
+            self.index = faiss.IndexFlatL2(dimension)
+        else:
+            self.index = faiss.IndexScalarQuantizer(dimension, quantizer_type, faiss.METRIC_L2)
+            # Learns the per-dimension value ranges that int8 codes are scaled to.
+            self.index.train(embeddings)
         self.index.add(embeddings)
 
+    def encode(self, queries: List[str]) -> np.ndarray:
+        """Embed queries in a single encode call; returns one row per query."""
+        return self.embedding_model.encode(queries, convert_to_numpy=True)
+
+    def search(self, query_embeddings: np.ndarray, with_embeddings: bool = False) -> List[List[Dict]]:
+        """
+        Run one multi-query FAISS search; returns retrieved chunks per query row.
+        with_embeddings attaches each chunk's stored vector (read back from the index,
+        not re-encoded) as chunk["embedding"], for the grounding check.
+        """
+        if self.index is None:
+            return [[] for _ in range(len(query_embeddings))]
+
+        distances, indices = self.index.search(query_embeddings, Config.TOP_K)
+
+        batch_results = []
+        for row_indices, row_distances in zip(indices, distances):
+            valid = row_indices[row_indices >= 0]
+            vectors = self.index.reconstruct_batch(valid) if with_embeddings and len(valid) else None
+            results = []
+            for position, (idx, distance) in enumerate(zip(valid, row_distances)):
+                chunk = self.chunks[idx]
+
+                result = {
+                    "text": chunk["text"],
+                    "document": chunk["document"],
+                    "page": chunk["page"],
+                    "relevance_score": float(1 / (1 + distance))
+                }
+                if vectors is not None:
+                    result["embedding"] = vectors[position]
+                results.append(result)
+            batch_results.append(results)
+
+        return batch_results
+
     def retrieve(self, query: str) -> List[Dict]:
         if self.index is None:
             return []
-        query_embedding = self.embedding_model.encode(
-            [query],
-            convert_to_numpy=True
-        )
-
-        distances, indices = self.index.search(query_embedding, Config.TOP_K)
-
-        results = []
-        for idx, distance in zip(indices[0], distances[0]):
-            chunk = self.chunks[idx]
-
-            results.append({
-                "text": chunk["text"],
-                "document": chunk["document"],
-                "page": chunk["page"],
-                "relevance_score": float(1 / (1 + distance))
-            })
+        return self.search(self.encode([query]))[0]
 
-        return results
\ No newline at end of file
+    def retrieve_batch(self, queries: List[str]) -> List[List[Dict]]:
+        if not queries:
+            return []
+        if self.index is None:
+            return [[] for _ in queries]
+        return self.search(self.encode(queries))
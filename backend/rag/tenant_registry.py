@@ -0,0 +1,131 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from config import Config
+from models import DEFAULT_TENANT, TENANT_ID_PATTERN, tenant_key
+from .retrieval_service import RetrievalService
+
+
+class UnknownTenantError(LookupError):
+    pass
+
+
+class TenantRegistry:
+    """
+    One RetrievalService per tenant corpus (the PDFs in tenants_dir/<tenant_id>/),
+    each with its own persisted index under INDEX_DIR/tenants/<tenant_id>/.
+
+    Tenants load on their first query, sharing the default retriever's embedding
+    model. At most max_resident tenant indexes stay in memory; the least recently
+    used is dropped when another one loads, and reloads from its persisted (and,
+    with MMAP_INDEX, memory-mapped) index next time. Requests without a tenant_id
+    use the default corpus, which is always resident.
+    """
+
+    def __init__(
+        self,
+        default: RetrievalService,
+        tenants_dir: Optional[str] = None,
+        max_resident: Optional[int] = None,
+        index_dir: Optional[str] = None,
+    ):
+        self.default = default
+        self.tenants_dir = tenants_dir or Config.TENANTS_DIR
+        self.max_resident = max(1, max_resident or Config.MAX_RESIDENT_TENANTS)
+        self.index_dir = index_dir or os.path.join(Config.INDEX_DIR, "tenants")
+
+        self._lock = threading.Lock()
+        self._resident: "OrderedDict[str, RetrievalService]" = OrderedDict()
+        # One lock per tenant, so a cold load blocks only that tenant's requests.
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._metrics: Dict[str, Dict] = {}
+
+    def exists(self, tenant_id: Optional[str]) -> bool:
+        tenant_id = tenant_key(tenant_id)
+        if tenant_id == DEFAULT_TENANT:
+            return True
+        return bool(re.fullmatch(TENANT_ID_PATTERN, tenant_id)) and os.path.isdir(os.path.join(self.tenants_dir, tenant_id))
+
+    def get(self, tenant_id: Optional[str]) -> RetrievalService:
+        """The tenant's loaded retriever, loading it (and evicting the LRU tenant) if needed."""
+        tenant_id = tenant_key(tenant_id)
+        if tenant_id == DEFAULT_TENANT:
+            return self.default
+        if not self.exists(tenant_id):
+            raise UnknownTenantError(tenant_id)
+
+        with self._lock:
+            retriever = self._touch(tenant_id)
+            if retriever is not None:
+                return retriever
+            load_lock = self._load_locks.setdefault(tenant_id, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                # Another request may have finished loading it while this one waited.
+                retriever = self._touch(tenant_id)
+                if retriever is not None:
+                    return retriever
+            retriever = RetrievalService(
+                docs_path=os.path.join(self.tenants_dir, tenant_id),
+                autoload=False,
+                index_dir=os.path.join(self.index_dir, tenant_id),
+                embedding_model=self.default.embedding_model,
+            )
+            retriever.load()
+
+            with self._lock:
+                self._resident[tenant_id] = retriever
+                stats = self._stats(tenant_id)
+                stats["loads"] += 1
+                stats["last_load_ms"] = retriever.load_ms
+                while len(self._resident) > self.max_resident:
+                    evicted, _ = self._resident.popitem(last=False)
+                    self._stats(evicted)["evictions"] += 1
+                    logging.getLogger(__name__).info("Evicted tenant %s index", evicted)
+            logging.getLogger(__name__).info(
+                "Loaded tenant %s: %d vectors in %d ms", tenant_id, retriever.index_size, retriever.load_ms
+            )
+            return retriever
+
+    def _touch(self, tenant_id: str) -> Optional[RetrievalService]:
+        retriever = self._resident.get(tenant_id)
+        if retriever is not None:
+            self._resident.move_to_end(tenant_id)
+        return retriever
+
+    def _stats(self, tenant_id: str) -> Dict:
+        return self._metrics.setdefault(tenant_id, {
+            "queries": 0, "cache_hits": 0, "total_latency_ms": 0,
+            "loads": 0, "last_load_ms": None, "evictions": 0, "last_query_at": None,
+        })
+
+    def record(self, tenant_id: Optional[str], cache_hit: bool, latency_ms: int) -> None:
+        with self._lock:
+            stats = self._stats(tenant_key(tenant_id))
+            stats["queries"] += 1
+            stats["cache_hits"] += int(cache_hit)
+            stats["total_latency_ms"] += latency_ms
+            stats["last_query_at"] = int(time.time())
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            tenants = {}
+            for tenant_id, stats in self._metrics.items():
+                stats = dict(stats)
+                total_latency_ms = stats.pop("total_latency_ms")
+                stats["mean_latency_ms"] = round(total_latency_ms / stats["queries"], 1) if stats["queries"] else None
+                retriever = self.default if tenant_id == DEFAULT_TENANT else self._resident.get(tenant_id)
+                stats["resident"] = retriever is not None
+                stats["index_size"] = retriever.index_size if retriever is not None else None
+                tenants[tenant_id] = stats
+            return {
+                "max_resident": self.max_resident,
+                "resident": list(self._resident),
+                "tenants": tenants,
+            }
@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .router_interface import Router
+from .RuleBasedRouter import RuleBasedRouter
+from config import Config
+
+
+def build_features(query: str, query_embedding, retrieved_chunks: List[Dict]) -> np.ndarray:
+    """
+    Feature vector shared by training (scripts/train_router.py) and routing:
+    the query embedding, retrieval confidence (top and mean top-3 relevance),
+    and two cheap shape features (word count, question marks).
+    """
+    scores = sorted((c.get("relevance_score", 0.0) for c in retrieved_chunks or []), reverse=True)
+    top = scores[0] if scores else 0.0
+    top3 = sum(scores[:3]) / len(scores[:3]) if scores else 0.0
+    extra = np.array(
+        [top, top3, len(query.split()) / 20.0, query.count("?")],
+        dtype=np.float32,
+    )
+    return np.concatenate([np.asarray(query_embedding, dtype=np.float32).ravel(), extra])
+
+
+class EmbeddingRouter(Router):
+    """
+    Logistic router over the query embedding RetrievalService already computed,
+    plus retrieval confidence. Costs one ~400-dim dot product per query.
+
+    The model file (trained by scripts/train_router.py) also stores mean latency
+    and token counts per model from the routing logs, used by estimate().
+    Without a model file or an embedding it defers to RuleBasedRouter.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, fallback: Optional[Router] = None):
+        self.model_path = model_path or Config.ROUTER_MODEL_PATH
+        self.fallback = fallback or RuleBasedRouter()
+        self.threshold = Config.ROUTER_COMPLEX_THRESHOLD
+        # (weights, bias), swapped as one reference so reload() is safe under concurrent requests
+        self._model: Optional[Tuple[np.ndarray, float]] = None
+        self.model_stats: Dict[str, Dict[str, float]] = {}
+        self.reload()
+
+    def reload(self) -> None:
+        """Load (or reload) the trained model. A missing file leaves the router on its fallback."""
+        if not os.path.exists(self.model_path):
+            logging.getLogger(__name__).warning("No router model at %s; using rule-based routing", self.model_path)
+            self._model = None
+            return
+        with np.load(self.model_path) as data:
+            # Fold the training-time standardization into the weights so routing is a single dot product.
+            weights = data["weights"].astype(np.float32) / data["scale"].astype(np.float32)
+            bias = float(data["bias"]) - float(np.dot(weights, data["mean"].astype(np.float32)))
+            self.model_stats = json.loads(str(data["model_stats"]))
+        self._model = (weights, bias)
+
+    def complex_probability(self, query: str, query_embedding, retrieved_chunks: Optional[List[Dict]]) -> float:
+        weights, bias = self._model
+        z = float(np.dot(weights, build_features(query, query_embedding, retrieved_chunks))) + bias
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def classify(
+        self,
+        query: str,
+        query_embedding=None,
+        retrieved_chunks: Optional[List[Dict]] = None,
+    ) -> Tuple[str, str]:
+        if self._model is None or query_embedding is None:
+            return self.fallback.classify(query, query_embedding, retrieved_chunks)
+
+        if self.complex_probability(query.strip(), query_embedding, retrieved_chunks) >= self.threshold:
+            return "complex", Config.BIG_MODEL
+        return "simple", Config.SMALL_MODEL
+
+    def estimate(self, classification: str) -> Dict[str, int]:
+        small = self.model_stats.get(Config.SMALL_MODEL)
+        big = self.model_stats.get(Config.BIG_MODEL)
+        if not small or not big:
+            return {}
+        chosen = big if classification == "complex" else small
+        saved = classification != "complex"
+        return {
+            "predicted_latency_ms": int(chosen["latency_ms"]),
+            "predicted_latency_saved_ms": int(big["latency_ms"] - small["latency_ms"]) if saved else 0,
+            "predicted_tokens_saved": int(big["tokens"] - small["tokens"]) if saved else 0,
+        }
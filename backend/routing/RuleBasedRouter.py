@@ -1,6 +1,7 @@
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 from .router_interface import Router
 from config import Config
+from keyword_matcher import KeywordFileWatcher, KeywordMatcher, load_keyword_file
 
 
 class RuleBasedRouter(Router):
@@ -40,7 +41,29 @@ class RuleBasedRouter(Router):
         "cannot get",
     ]
     
-    def classify(self, query: str) -> Tuple[str, str]:
+
+    def __init__(self, keywords_path: Optional[str] = None):
+        # Extra "simple"/"complex" phrases from a JSON file are added to the built-in lists.
+        self.keywords_path = Config.KEYWORDS_PATH if keywords_path is None else keywords_path
+        # Edits to the file are picked up within KEYWORDS_RELOAD_SECONDS, without a restart.
+        self._watcher = KeywordFileWatcher(self.keywords_path, Config.KEYWORDS_RELOAD_SECONDS)
+        self.reload()
+
+    def reload(self) -> None:
+        """Rebuild the matcher from the built-in lists plus keywords_path. Raises on a bad file; the old matcher stays."""
+        extra = load_keyword_file(self.keywords_path)
+        self._matcher = KeywordMatcher({
+            "simple": self.SIMPLE_KEYWORDS + extra.get("simple", []),
+            "complex": self.COMPLEX_KEYWORDS + extra.get("complex", []),
+        })
+
+    def classify(
+        self,
+        query: str,
+        query_embedding=None,
+        retrieved_chunks: Optional[List[Dict]] = None,
+    ) -> Tuple[str, str]:
+        self._watcher.poll(self.reload)
         query_clean = query.strip().lower()
         word_count = len(query_clean.split())
         question_marks = query_clean.count("?")
@@ -49,12 +72,14 @@ class RuleBasedRouter(Router):
             return "complex", Config.BIG_MODEL
         if word_count > 20:
             return "complex", Config.BIG_MODEL
-        if any(keyword in query_clean for keyword in self.COMPLEX_KEYWORDS):
+
+        matched = self._matcher.categories(query_clean)
+        if "complex" in matched:
             return "complex", Config.BIG_MODEL
 
         if word_count <= 8:
             return "simple", Config.SMALL_MODEL
-        if any(keyword in query_clean for keyword in self.SIMPLE_KEYWORDS):
+        if "simple" in matched:
             return "simple", Config.SMALL_MODEL
 
         return "simple", Config.SMALL_MODEL
\ No newline at end of file
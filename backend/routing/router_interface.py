@@ -1,7 +1,20 @@
 from abc import abstractmethod ,ABC
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 
 class Router(ABC):
     @abstractmethod
-    def classify(self, query:str) -> Tuple[str, str]:
-        pass
\ No newline at end of file
+    def classify(
+        self,
+        query: str,
+        query_embedding=None,
+        retrieved_chunks: Optional[List[Dict]] = None,
+    ) -> Tuple[str, str]:
+        """
+        Returns (classification, model_name). query_embedding and retrieved_chunks are what
+        retrieval already computed for this query; routers that do not need them ignore them.
+        """
+        pass
+
+    def estimate(self, classification: str) -> Dict[str, int]:
+        """Predicted latency/token effects of a routing decision, for the routing log. Empty if unknown."""
+        return {}
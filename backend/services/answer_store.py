@@ -0,0 +1,57 @@
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from config import Config
+from models import QueryResponse
+
+
+class AnswerStore:
+    """
+    Precomputed QueryResponses for frequently asked questions (built offline by
+    scripts/warm_cache.py), one JSON file per corpus version. An index rebuilt from
+    changed PDFs gets a new corpus version, so stale answers are never loaded.
+    """
+
+    def __init__(self, store_dir: Optional[str] = None):
+        self.store_dir = Config.ANSWER_STORE_DIR if store_dir is None else store_dir
+
+    def path(self, corpus_version: str) -> str:
+        return os.path.join(self.store_dir, f"answers_{corpus_version}.json")
+
+    def load(self, corpus_version: Optional[str]) -> Dict[str, QueryResponse]:
+        """Question -> response for this corpus version; empty when there is no store for it."""
+        if not self.store_dir or not corpus_version:
+            return {}
+        path = self.path(corpus_version)
+        if not os.path.exists(path):
+            logging.getLogger(__name__).info("No precomputed answers for corpus %s", corpus_version)
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("llm_provider") != Config.LLM_PROVIDER:
+            # e.g. answers precomputed with the stub LLM must not be served by a Groq deployment
+            logging.getLogger(__name__).warning(
+                "Skipping %s: built with LLM_PROVIDER=%s, running with %s",
+                path, data.get("llm_provider"), Config.LLM_PROVIDER,
+            )
+            return {}
+        return {question: QueryResponse.model_validate(r) for question, r in data["answers"].items()}
+
+    def save(self, corpus_version: str, responses: Dict[str, QueryResponse]) -> str:
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = self.path(corpus_version)
+        data = {
+            "corpus_version": corpus_version,
+            "llm_provider": Config.LLM_PROVIDER,
+            "created_at": int(time.time()),
+            # by_alias=False so TokenUsage round-trips through model_validate
+            "answers": {question: r.model_dump(by_alias=False) for question, r in responses.items()},
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+        return path
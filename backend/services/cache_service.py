@@ -1,20 +1,47 @@
-from typing import Optional
-from models import QueryResponse
+from typing import Dict, Optional, Tuple
+from models import QueryResponse, tenant_key
+from services.stream_frames import StreamFrames
 
 
 class CacheService:
 
     def __init__(self):
         self._cache = {}
+        # key -> (response, its pre-serialized SSE frames); dropped whenever the response is replaced
+        self._frames: Dict[Tuple[str, str], Tuple[QueryResponse, StreamFrames]] = {}
 
-    def _normalize(self, question: str) -> str:
+    def _normalize(self, question: str, tenant_id: Optional[str] = None) -> Tuple[str, str]:
+        # Tenants have separate corpora, so the same question can have different answers.
+        return (tenant_key(tenant_id), question.strip().lower())
 
-        return question.strip().lower()
-
-    def get(self, question: str) -> Optional[QueryResponse]:
-        key = self._normalize(question)
+    def get(self, question: str, tenant_id: Optional[str] = None) -> Optional[QueryResponse]:
+        key = self._normalize(question, tenant_id)
         return self._cache.get(key)
 
-    def set(self, question: str, response: QueryResponse) -> None:
-        key = self._normalize(question)
-        self._cache[key] = response
\ No newline at end of file
+    def set(self, question: str, response: QueryResponse, frames: Optional[StreamFrames] = None, tenant_id: Optional[str] = None) -> None:
+        key = self._normalize(question, tenant_id)
+        self._cache[key] = response
+        if frames is not None:
+            self._frames[key] = (response, frames)
+        else:
+            self._frames.pop(key, None)
+
+    def get_frames(self, question: str, tenant_id: Optional[str] = None) -> Optional[StreamFrames]:
+        entry = self._frames.get(self._normalize(question, tenant_id))
+        return entry[1] if entry else None
+
+    def set_frames(self, question: str, response: QueryResponse, frames: StreamFrames, tenant_id: Optional[str] = None) -> None:
+        """Attach frames built from response, unless the entry has been replaced in the meantime."""
+        key = self._normalize(question, tenant_id)
+        if self._cache.get(key) is response:
+            self._frames[key] = (response, frames)
+
+    def warm(self, responses: Dict[str, QueryResponse], tenant_id: Optional[str] = None) -> int:
+        """Preload precomputed answers; entries already cached are kept. Returns how many were added."""
+        added = 0
+        for question, response in responses.items():
+            key = self._normalize(question, tenant_id)
+            if key not in self._cache:
+                self._cache[key] = response
+                added += 1
+        return added
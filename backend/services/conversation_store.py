@@ -1,18 +1,22 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from models import tenant_key
 
 MAX_TURNS = 5 
 
 
 class ConversationStore:
     def __init__(self):
-        self._store: Dict[str, List[Dict[str, str]]] = {}
+        # Keyed by (tenant_id, conversation_id) so one tenant cannot read another's history.
+        self._store: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
 
-    def get(self, conversation_id: str) -> List[Dict[str, str]]:
-        return self._store.get(conversation_id, [])
+    def get(self, conversation_id: str, tenant_id: Optional[str] = None) -> List[Dict[str, str]]:
+        return self._store.get((tenant_key(tenant_id), conversation_id), [])
 
-    def append(self, conversation_id: str, role: str, content: str) -> None:
-        messages = self._store.get(conversation_id, [])
+    def append(self, conversation_id: str, role: str, content: str, tenant_id: Optional[str] = None) -> None:
+        key = (tenant_key(tenant_id), conversation_id)
+        messages = self._store.get(key, [])
         messages.append({"role": role, "content": content})
         if len(messages) > MAX_TURNS * 2:
             messages = messages[-(MAX_TURNS * 2) :]
-        self._store[conversation_id] = messages
+        self._store[key] = messages
@@ -1,16 +1,25 @@
 import json
 import logging
+import threading
 import time
 import uuid
-from typing import Dict, Iterator, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from config import Config
 from models import (
+    DEFAULT_TENANT,
+    BatchQueryRequest,
+    GroundingReport,
     QueryRequest,
     QueryResponse,
     Metadata,
     TokenUsage,
-    Source
+    Source,
+    tenant_key,
 )
+from rag.tenant_registry import UnknownTenantError
+from services.stream_frames import StreamFrames, sse_frame
 
 
 class QueryService:
@@ -22,7 +31,9 @@ class QueryService:
         evaluator,
         cache,
         conversation_store,
-        logger
+        logger,
+        grounding=None,
+        tenants=None
     ):
         self.router = router
         self.retriever = retriever
@@ -31,6 +42,14 @@ class QueryService:
         self.cache = cache
         self.conversation_store = conversation_store
         self.logger = logger
+        # Optional GroundingEvaluator; needs chunk embeddings from retrieval
+        self.grounding = grounding
+        # Optional TenantRegistry; without one only the default corpus (self.retriever) is served
+        self.tenants = tenants
+        # Streamed answers are grounded here after the stream has closed, one at a time
+        self._grounding_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="grounding") if grounding else None
+        # Bounds queued + running checks; past it a streamed answer is simply not graded
+        self._grounding_slots = threading.BoundedSemaphore(max(1, Config.GROUNDING_QUEUE_MAX))
 
     def handle_query(self, request: QueryRequest) -> QueryResponse:
 
@@ -38,19 +57,18 @@ class QueryService:
 
         question = request.question.strip()
         conversation_id = request.conversation_id or f"conv_{uuid.uuid4().hex[:8]}"
+        tenant_id = request.tenant_id
 
         if not request.conversation_id:
-            cached_response = self.cache.get(question)
+            cached_response = self.cache.get(question, tenant_id=tenant_id)
             if cached_response:
                 logging.getLogger(__name__).info("CACHE HIT query=%r", question[:80] + ("..." if len(question) > 80 else ""))
-                return cached_response.model_copy(
-                    update={"metadata": cached_response.metadata.model_copy(update={"cache_hit": True}), "conversation_id": conversation_id}
-                )
+                self._record(tenant_id, True, start_time)
+                return self._from_cache(cached_response, conversation_id)
 
-        classification, model_name = self.router.classify(question)
-        retrieved_chunks: List[Dict] = self.retriever.retrieve(question)
+        retrieved_chunks, classification, model_name = self._retrieve_and_route(question, self._retriever(tenant_id))
         context = "\n\n".join(chunk["text"] for chunk in retrieved_chunks)
-        history = self.conversation_store.get(conversation_id) if request.conversation_id else None
+        history = self.conversation_store.get(conversation_id, tenant_id) if request.conversation_id else None
 
         answer, tokens_in, tokens_out = self.llm.generate(
             model=model_name,
@@ -60,8 +78,125 @@ class QueryService:
             history=history,
         )
 
+        self.conversation_store.append(conversation_id, "user", question, tenant_id)
+        self.conversation_store.append(conversation_id, "assistant", answer, tenant_id)
+
+        response = self._build_response(
+            question=question,
+            conversation_id=conversation_id,
+            classification=classification,
+            model_name=model_name,
+            retrieved_chunks=retrieved_chunks,
+            answer=answer,
+            tokens_in=tokens_in,
+            tokens_out=tokens_out,
+            start_time=start_time,
+            tenant_id=tenant_id,
+        )
+
+        if not request.conversation_id:
+            self.cache.set(question, response, tenant_id=tenant_id)
+
+        return response
+
+    def _retriever(self, tenant_id: Optional[str]):
+        """The retriever for the tenant's corpus, loading it on first use."""
+        if self.tenants is not None:
+            return self.tenants.get(tenant_id)
+        if tenant_key(tenant_id) != DEFAULT_TENANT:
+            raise UnknownTenantError(tenant_id)
+        return self.retriever
+
+    def _record(self, tenant_id: Optional[str], cache_hit: bool, start_time: float) -> None:
+        if self.tenants is not None:
+            self.tenants.record(tenant_id, cache_hit, int((time.time() - start_time) * 1000))
+
+    def _retrieve_and_route(self, question: str, retriever) -> Tuple[List[Dict], str, str]:
+        # Retrieval runs first so the router can reuse the query embedding and relevance scores.
+        query_embeddings = retriever.encode([question])
+        retrieved_chunks = retriever.search(query_embeddings, with_embeddings=self.grounding is not None)[0]
+        classification, model_name = self.router.classify(
+            question, query_embedding=query_embeddings[0], retrieved_chunks=retrieved_chunks
+        )
+        return retrieved_chunks, classification, model_name
+
+    def _ground(self, question: str, answer: str, retrieved_chunks: List[Dict], flags: List[str]) -> Optional[GroundingReport]:
+        # Refusals have nothing to ground; a failed check never fails the request.
+        if self.grounding is None or "refusal" in flags:
+            return None
+        try:
+            report = self.grounding.check(answer, retrieved_chunks)
+        except Exception:
+            logging.getLogger(__name__).exception("Grounding check failed for query=%r", question[:80])
+            return None
+        if report:
+            logging.getLogger(__name__).info(
+                "GROUNDING query=%r grounded_ratio=%.2f unsupported=%d cost_ms=%.1f",
+                question[:80], report.grounded_ratio, len(report.unsupported_sentences), report.cost_ms,
+            )
+        return report
+
+    def _ground_cached(
+        self,
+        question: str,
+        response: QueryResponse,
+        retrieved_chunks: List[Dict],
+        chunk_frames: List[str],
+        tenant_id: Optional[str],
+    ) -> None:
+        """Ground a streamed answer after its stream closed, so later hits (and /query) carry the full evaluation."""
+        try:
+            self._grade_cached(question, response, retrieved_chunks, chunk_frames, tenant_id)
+        finally:
+            self._grounding_slots.release()
+
+    def _grade_cached(
+        self,
+        question: str,
+        response: QueryResponse,
+        retrieved_chunks: List[Dict],
+        chunk_frames: List[str],
+        tenant_id: Optional[str],
+    ) -> None:
+        flags = response.metadata.evaluator_flags
+        grounding = self._ground(question, response.answer, retrieved_chunks, flags)
+        if grounding is None:
+            return
+        if grounding.unsupported_sentences:
+            flags = flags + ["ungrounded"]
+        graded = response.model_copy(update={"metadata": response.metadata.model_copy(update={
+            "grounding": grounding,
+            "evaluator_flags": flags,
+            "evaluator_message": "Low confidence — please verify with support." if flags else None,
+        })})
+        # Leave the entry alone if another request replaced it meanwhile.
+        if self.cache.get(question, tenant_id=tenant_id) is response:
+            self.cache.set(question, graded, StreamFrames.from_response(graded, chunk_frames), tenant_id=tenant_id)
+
+    def _from_cache(self, cached_response: QueryResponse, conversation_id: str) -> QueryResponse:
+        return cached_response.model_copy(
+            update={"metadata": cached_response.metadata.model_copy(update={"cache_hit": True}), "conversation_id": conversation_id}
+        )
 
+    def _build_response(
+        self,
+        question: str,
+        conversation_id: str,
+        classification: str,
+        model_name: str,
+        retrieved_chunks: List[Dict],
+        answer: str,
+        tokens_in: int,
+        tokens_out: int,
+        start_time: float,
+        ground: bool = True,
+        tenant_id: Optional[str] = None,
+    ) -> QueryResponse:
+        """Evaluate (and ground, unless the caller does it later) the answer, write the routing log entry, and assemble the response."""
         flags = self.evaluator.evaluate(answer, retrieved_chunks)
+        grounding = self._ground(question, answer, retrieved_chunks, flags) if ground else None
+        if grounding and grounding.unsupported_sentences:
+            flags.append("ungrounded")
         evaluator_message = "Low confidence — please verify with support." if flags else None
 
         sources = [
@@ -86,62 +221,178 @@ class QueryService:
             chunks_retrieved=len(retrieved_chunks),
             evaluator_flags=flags,
             evaluator_message=evaluator_message,
-            cache_hit=False
+            cache_hit=False,
+            grounding=grounding
         )
 
-        self.conversation_store.append(conversation_id, "user", question)
-        self.conversation_store.append(conversation_id, "assistant", answer)
+        self.logger.log(
+            query=question,
+            classification=classification,
+            model_used=model_name,
+            tokens_input=tokens_in,
+            tokens_output=tokens_out,
+            latency_ms=latency_ms,
+            tenant_id=tenant_id,
+            # Flags are only a complete outcome once grounding has run (streams ground after this entry).
+            evaluator_flags=flags if ground or self.grounding is None else None,
+            **self.router.estimate(classification)
+        )
+        self._record(tenant_id, False, start_time)
 
-        response = QueryResponse(
+        return QueryResponse(
             answer=answer,
             metadata=metadata,
             sources=sources,
             conversation_id=conversation_id
         )
 
-        if not request.conversation_id:
-            self.cache.set(question, response)
+    def _yield_ndjson(self, obj: dict) -> str:
+        return json.dumps(obj) + "\n"
 
-        self.logger.log(
-            query=question,
-            classification=classification,
-            model_used=model_name,
-            tokens_input=tokens_in,
-            tokens_output=tokens_out,
-            latency_ms=latency_ms
-        )
+    def handle_batch(self, request: BatchQueryRequest) -> Iterator[str]:
+        """
+        Answer many independent questions, streaming one NDJSON line per item as it finishes.
+        Lines: {"index": i, "question": "...", "response": {...}} or {"index": i, "question": "...", "error": "..."}.
+        Duplicate questions are answered once; cache misses share one encode call and one FAISS
+        search, and LLM calls run on a bounded thread pool. Each item gets its own conversation_id.
+        """
+        start_time = time.time()
+        log = logging.getLogger(__name__)
+        questions = [q.strip() for q in request.questions]
+        tenant_id = request.tenant_id
 
-        return response
+        # Group item indices by cache key so each distinct question is answered once.
+        groups: Dict[str, List[int]] = {}
+        for index, question in enumerate(questions):
+            groups.setdefault(question.lower(), []).append(index)
+
+        def item_lines(indices: List[int], response: QueryResponse | None = None, error: str | None = None) -> Iterator[str]:
+            for index in indices:
+                item = {"index": index, "question": questions[index]}
+                if error is not None:
+                    item["error"] = error
+                else:
+                    conversation_id = f"conv_{uuid.uuid4().hex[:8]}"
+                    if not response.metadata.cache_hit:
+                        self.conversation_store.append(conversation_id, "user", questions[index], tenant_id)
+                        self.conversation_store.append(conversation_id, "assistant", response.answer, tenant_id)
+                    item["response"] = response.model_copy(update={"conversation_id": conversation_id}).model_dump()
+                yield self._yield_ndjson(item)
+
+        misses: List[List[int]] = []
+        for indices in groups.values():
+            cached_response = self.cache.get(questions[indices[0]], tenant_id=tenant_id)
+            if cached_response:
+                self._record(tenant_id, True, start_time)
+                yield from item_lines(indices, self._from_cache(cached_response, ""))
+            else:
+                misses.append(indices)
+        log.info("BATCH size=%d unique=%d cache_misses=%d", len(questions), len(groups), len(misses))
+        if not misses:
+            return
+
+        miss_questions = [questions[indices[0]] for indices in misses]
+        try:
+            retriever = self._retriever(tenant_id)
+            query_embeddings = retriever.encode(miss_questions)
+            retrieved = retriever.search(query_embeddings, with_embeddings=self.grounding is not None)
+            routes = [
+                self.router.classify(question, query_embedding=query_embeddings[i], retrieved_chunks=retrieved[i])
+                for i, question in enumerate(miss_questions)
+            ]
+        except Exception as e:
+            log.exception("Batch retrieval failed")
+            for indices in misses:
+                yield from item_lines(indices, error=str(e))
+            return
+
+        max_workers = min(request.max_concurrency or Config.BATCH_MAX_CONCURRENCY, Config.BATCH_MAX_CONCURRENCY, len(misses))
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch-llm")
+        try:
+            futures = {}
+            for position, question in enumerate(miss_questions):
+                classification, model_name = routes[position]
+                future = executor.submit(
+                    self._timed_generate,
+                    model=model_name,
+                    context="\n\n".join(chunk["text"] for chunk in retrieved[position]),
+                    question=question,
+                    classification=classification,
+                    history=None,
+                )
+                futures[future] = position
+
+            for future in as_completed(futures):
+                position = futures[future]
+                question = miss_questions[position]
+                classification, model_name = routes[position]
+                try:
+                    item_start, (answer, tokens_in, tokens_out) = future.result()
+                    response = self._build_response(
+                        question=question,
+                        conversation_id="",
+                        classification=classification,
+                        model_name=model_name,
+                        retrieved_chunks=retrieved[position],
+                        answer=answer,
+                        tokens_in=tokens_in,
+                        tokens_out=tokens_out,
+                        start_time=item_start,
+                        tenant_id=tenant_id,
+                    )
+                except Exception as e:
+                    log.exception("Batch item failed for query=%r", question[:80])
+                    yield from item_lines(misses[position], error=str(e))
+                    continue
+                self.cache.set(question, response, tenant_id=tenant_id)
+                yield from item_lines(misses[position], response)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _timed_generate(self, **kwargs) -> Tuple[float, Tuple[str, int, int]]:
+        # Batch items are timed from when their own LLM call starts, not from when the batch
+        # arrived, so latency_ms (and the per-model means the router trains on) excludes queueing.
+        start_time = time.time()
+        return start_time, self.llm.generate(**kwargs)
 
     def _yield_sse(self, obj: dict) -> str:
-        return f"data: {json.dumps(obj)}\n\n"
+        return sse_frame(obj)
 
     def handle_query_stream(self, request: QueryRequest) -> Iterator[str]:
         """
         Stream the answer as SSE events. Yields "data: {json}\n\n".
         Events: {"type": "chunk", "content": "..."}; {"type": "done", ...}; or {"type": "error", "message": "..."}.
+        The stream closes after "done". With grounding enabled, a cache miss is grounded in the background
+        afterwards, so the check adds nothing to user-visible latency; later cache hits carry its report.
+        Cache hits replay the pre-serialized frames of the cached answer (see StreamFrames).
         """
         start_time = time.time()
         question = request.question.strip()
         conversation_id = request.conversation_id or f"conv_{uuid.uuid4().hex[:8]}"
+        tenant_id = request.tenant_id
         log = logging.getLogger(__name__)
 
         try:
             if not request.conversation_id:
-                cached_response = self.cache.get(question)
-                if cached_response:
+                frames = self.cache.get_frames(question, tenant_id=tenant_id)
+                if frames is None:
+                    cached_response = self.cache.get(question, tenant_id=tenant_id)
+                    if cached_response:
+                        # Cached by /query, batch, or the answer store: serialize once, replay from then on.
+                        frames = StreamFrames.from_response(cached_response)
+                        self.cache.set_frames(question, cached_response, frames, tenant_id=tenant_id)
+                if frames:
                     log.info("CACHE HIT query=%r", question[:80] + ("..." if len(question) > 80 else ""))
-                    meta = cached_response.metadata.model_copy(update={"cache_hit": True})
-                    yield self._yield_sse({"type": "chunk", "content": cached_response.answer})
-                    yield self._yield_sse({"type": "done", "metadata": meta.model_dump(), "sources": [s.model_dump() for s in cached_response.sources], "conversation_id": conversation_id})
+                    self._record(tenant_id, True, start_time)
+                    yield from frames.replay(conversation_id, Config.CACHE_REPLAY_CHUNKS_PER_SEC)
                     return
 
-            classification, model_name = self.router.classify(question)
-            retrieved_chunks: List[Dict] = self.retriever.retrieve(question)
+            retrieved_chunks, classification, model_name = self._retrieve_and_route(question, self._retriever(tenant_id))
             context = "\n\n".join(chunk["text"] for chunk in retrieved_chunks)
-            history = self.conversation_store.get(conversation_id) if request.conversation_id else None
+            history = self.conversation_store.get(conversation_id, tenant_id) if request.conversation_id else None
 
             answer_parts: List[str] = []
+            chunk_frames: List[str] = []
             tokens_in, tokens_out = 0, 0
             for chunk_text, ti, to in self.llm.generate_stream(
                 model=model_name,
@@ -152,34 +403,39 @@ class QueryService:
             ):
                 if chunk_text:
                     answer_parts.append(chunk_text)
-                    yield self._yield_sse({"type": "chunk", "content": chunk_text})
+                    frame = self._yield_sse({"type": "chunk", "content": chunk_text})
+                    chunk_frames.append(frame)
+                    yield frame
                 else:
                     tokens_in, tokens_out = ti, to
 
             answer = "".join(answer_parts)
-            self.conversation_store.append(conversation_id, "user", question)
-            self.conversation_store.append(conversation_id, "assistant", answer)
-            flags = self.evaluator.evaluate(answer, retrieved_chunks)
-            evaluator_message = "Low confidence — please verify with support." if flags else None
-            sources = [
-                Source(document=chunk["document"], page=chunk["page"], relevance_score=chunk["relevance_score"])
-                for chunk in retrieved_chunks
-            ]
-            latency_ms = int((time.time() - start_time) * 1000)
-            metadata = Metadata(
-                model_used=model_name,
+            self.conversation_store.append(conversation_id, "user", question, tenant_id)
+            self.conversation_store.append(conversation_id, "assistant", answer, tenant_id)
+            response = self._build_response(
+                question=question,
+                conversation_id=conversation_id,
                 classification=classification,
-                tokens=TokenUsage(input_tokens=tokens_in, output_tokens=tokens_out),
-                latency_ms=latency_ms,
-                chunks_retrieved=len(retrieved_chunks),
-                evaluator_flags=flags,
-                evaluator_message=evaluator_message,
-                cache_hit=False
+                model_name=model_name,
+                retrieved_chunks=retrieved_chunks,
+                answer=answer,
+                tokens_in=tokens_in,
+                tokens_out=tokens_out,
+                start_time=start_time,
+                ground=False,
+                tenant_id=tenant_id,
             )
+            done = response.model_dump(exclude={"answer"})
             if not request.conversation_id:
-                self.cache.set(question, QueryResponse(answer=answer, metadata=metadata, sources=sources, conversation_id=conversation_id))
-            self.logger.log(query=question, classification=classification, model_used=model_name, tokens_input=tokens_in, tokens_output=tokens_out, latency_ms=latency_ms)
-            yield self._yield_sse({"type": "done", "metadata": metadata.model_dump(), "sources": [s.model_dump() for s in sources], "conversation_id": conversation_id})
+                # Keep the frames just sent so a hit replays this exact stream.
+                cached_done = {"metadata": {**done["metadata"], "cache_hit": True}, "sources": done["sources"]}
+                self.cache.set(question, response, StreamFrames(chunk_frames, cached_done), tenant_id=tenant_id)
+            yield self._yield_sse({"type": "done", **done})
+            if self._grounding_pool is not None and not request.conversation_id:
+                if self._grounding_slots.acquire(blocking=False):
+                    self._grounding_pool.submit(self._ground_cached, question, response, retrieved_chunks, chunk_frames, tenant_id)
+                else:
+                    log.info("Grounding queue full; not grading query=%r", question[:80])
         except Exception as e:
             log.exception("Stream error for query=%r", question[:80])
             yield self._yield_sse({"type": "error", "message": str(e)})
\ No newline at end of file
@@ -0,0 +1,60 @@
+import json
+import re
+import time
+from typing import Iterator, List, Optional
+
+from models import QueryResponse
+
+# Word-sized pieces (with trailing whitespace), about what the LLM streams per event.
+_PIECE = re.compile(r"\S+\s*|\s+")
+
+
+def sse_frame(obj: dict) -> str:
+    return f"data: {json.dumps(obj)}\n\n"
+
+
+class StreamFrames:
+    """
+    A cached answer as ready-to-send /query/stream output: the chunk frames joined
+    into one string (with frame boundaries for paced replay) and the "done" frame
+    serialized up to its conversation_id, which is the only per-request field.
+    A cache hit is then string slicing and one short json.dumps instead of
+    model_copy + model_dump + json.dumps over the whole response.
+    """
+
+    __slots__ = ("body", "boundaries", "done_prefix")
+
+    def __init__(self, chunk_frames: List[str], done: dict):
+        self.body = "".join(chunk_frames)
+        boundaries, offset = [], 0
+        for frame in chunk_frames:
+            offset += len(frame)
+            boundaries.append(offset)
+        self.boundaries = boundaries
+        # done must not contain conversation_id; it is appended last on replay.
+        self.done_prefix = "data: " + json.dumps({"type": "done", **done})[:-1] + ', "conversation_id": '
+
+    @classmethod
+    def from_response(cls, response: QueryResponse, chunk_frames: Optional[List[str]] = None) -> "StreamFrames":
+        """Frames for a cached response. Without the original chunk frames the answer is split into words."""
+        if chunk_frames is None:
+            chunk_frames = [sse_frame({"type": "chunk", "content": piece}) for piece in _PIECE.findall(response.answer)]
+        done = response.model_dump(exclude={"answer", "conversation_id"})
+        done["metadata"]["cache_hit"] = True
+        return cls(chunk_frames, done)
+
+    def done_frame(self, conversation_id: str) -> str:
+        return f"{self.done_prefix}{json.dumps(conversation_id)}}}\n\n"
+
+    def replay(self, conversation_id: str, chunks_per_sec: float = 0.0) -> Iterator[str]:
+        """All frames in one write, or paced at chunks_per_sec to look like a live stream."""
+        if chunks_per_sec <= 0:
+            yield self.body + self.done_frame(conversation_id)
+            return
+        delay = 1.0 / chunks_per_sec
+        start = 0
+        for end in self.boundaries:
+            yield self.body[start:end]
+            start = end
+            time.sleep(delay)
+        yield self.done_frame(conversation_id)
@@ -56,6 +56,40 @@ function getTokens(res: QueryResponse) {
 
 const HEALTH_POLL_INTERVAL_MS = 5000;
 const HEALTH_POLL_DURATION_MS = 60000;
+const STARTUP_RETRIES = 12;
+
+type BackendStatus = "ready" | "loading" | "failed" | "unreachable";
+
+async function readiness(): Promise<BackendStatus> {
+  try {
+    const res = await fetch(`${API_BASE}/ready`);
+    if (res.ok) return "ready";
+    const body = await res.json().catch(() => null);
+    if (body?.status === "loading") return "loading";
+    return body?.status === "failed" ? "failed" : "unreachable";
+  } catch {
+    return "unreachable";
+  }
+}
+
+// While the index loads, query endpoints answer 503 with Retry-After; wait and resend instead of failing.
+async function postWhenReady(url: string, body: string): Promise<Response> {
+  for (let attempt = 0; ; attempt++) {
+    const res = await fetch(url, { method: "POST", headers: { "Content-Type": "application/json" }, body });
+    const retryAfter = Number(res.headers.get("Retry-After"));
+    if (res.status !== 503 || !retryAfter || attempt >= STARTUP_RETRIES) return res;
+    await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+  }
+}
+
+function errorDetail(text: string): string {
+  try {
+    const detail = JSON.parse(text).detail;
+    return typeof detail === "string" ? detail : text;
+  } catch {
+    return text;
+  }
+}
 
 export default function Home() {
   const [messages, setMessages] = useState<Message[]>([]);
@@ -63,7 +97,7 @@ export default function Home() {
   const [conversationId, setConversationId] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const [backendHealthy, setBackendHealthy] = useState<boolean | null>(null);
+  const [backendStatus, setBackendStatus] = useState<BackendStatus | null>(null);
   const [healthPollActive, setHealthPollActive] = useState(true);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
@@ -73,24 +107,20 @@ export default function Home() {
 
   useEffect(() => {
     if (!healthPollActive) return;
+    // /ready, not /health: the port opens (and /health is ok) before the index has loaded.
+    const started = Date.now();
     const check = async () => {
-      try {
-        const res = await fetch(`${API_BASE}/health`);
-        setBackendHealthy(res.ok);
-      } catch {
-        setBackendHealthy(false);
+      const status = await readiness();
+      setBackendStatus(status);
+      // Keep polling past the usual minute while the index is still loading.
+      if (status !== "loading" && Date.now() - started >= HEALTH_POLL_DURATION_MS) {
+        clearInterval(interval);
+        setHealthPollActive(false);
       }
     };
     check();
     const interval = setInterval(check, HEALTH_POLL_INTERVAL_MS);
-    const stop = setTimeout(() => {
-      clearInterval(interval);
-      setHealthPollActive(false);
-    }, HEALTH_POLL_DURATION_MS);
-    return () => {
-      clearInterval(interval);
-      clearTimeout(stop);
-    };
+    return () => clearInterval(interval);
   }, [healthPollActive]);
 
   async function handleSubmit(e: React.FormEvent) {
@@ -102,17 +132,16 @@ export default function Home() {
     setMessages((prev) => [...prev, { role: "user", content: q }, { role: "assistant", content: "" }]);
     setInput("");
     try {
-      const res = await fetch(`${API_BASE}/query/stream`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
+      const res = await postWhenReady(
+        `${API_BASE}/query/stream`,
+        JSON.stringify({
           question: q,
           ...(conversationId && { conversation_id: conversationId }),
         }),
-      });
+      );
       if (!res.ok) {
         const text = await res.text();
-        throw new Error(text || `HTTP ${res.status}`);
+        throw new Error(errorDetail(text) || `HTTP ${res.status}`);
       }
       const reader = res.body?.getReader();
       const decoder = new TextDecoder();
@@ -184,14 +213,26 @@ export default function Home() {
           <h1 className="text-lg font-semibold text-zinc-900 dark:text-zinc-100">ClearPath Chatbot</h1>
           <p className="text-xs text-zinc-500 dark:text-zinc-400 mt-0.5 flex items-center gap-2">
             Ask about the docs · streaming + conversation memory
-            {healthPollActive || backendHealthy !== null ? (
-              <span className="inline-flex items-center gap-1.5 text-zinc-500 dark:text-zinc-400" title="Backend health (polls every 5s for 1 min)">
+            {healthPollActive || backendStatus !== null ? (
+              <span className="inline-flex items-center gap-1.5 text-zinc-500 dark:text-zinc-400" title="Backend readiness (polls every 5s for 1 min, longer while loading)">
                 <span
                   className={`inline-block h-1.5 w-1.5 rounded-full ${
-                    backendHealthy === null ? "bg-amber-500 animate-pulse" : backendHealthy ? "bg-emerald-500" : "bg-red-500"
+                    backendStatus === null || backendStatus === "loading"
+                      ? "bg-amber-500 animate-pulse"
+                      : backendStatus === "ready"
+                        ? "bg-emerald-500"
+                        : "bg-red-500"
                   }`}
                 />
-                {backendHealthy === null ? "checking…" : backendHealthy ? "backend ok" : "backend unreachable"}
+                {backendStatus === null
+                  ? "checking…"
+                  : backendStatus === "ready"
+                    ? "backend ok"
+                    : backendStatus === "loading"
+                      ? "backend loading…"
+                      : backendStatus === "failed"
+                        ? "backend failed to load"
+                        : "backend unreachable"}
               </span>
             ) : null}
           </p>
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Cold-load vs. warm-query latency for tenant corpora as the number of tenants grows.
+
+For each tenant count, builds that many synthetic tenants (each a different
+subset of clearpath_docs, symlinked into a temp TENANTS_DIR) and times retrieval
+through TenantRegistry, in-process with one shared embedding model:
+
+  build      first query per tenant: chunk, embed, and persist its index
+  cold_load  first query after a restart: read the persisted index
+  warm       query against a resident index
+  mixed      --queries queries over all tenants with Zipf-distributed popularity,
+             so once tenants > --max-resident some queries pay a reload
+
+Usage (from project root):
+  python scripts/bench_tenants.py
+  python scripts/bench_tenants.py --tenants 1,8,32,128 --max-resident 8 --docs-per-tenant 3 --output tenants.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPT_DIR.parent
+DOCS_PATH = ROOT_DIR / "clearpath_docs"
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import run_eval  # noqa: E402
+from config import Config  # noqa: E402
+from rag.retrieval_service import RetrievalService  # noqa: E402
+from rag.tenant_registry import TenantRegistry  # noqa: E402
+
+QUERY = "What is the price of the Pro plan?"
+
+
+def make_tenants(root: Path, count: int, docs_per_tenant: int) -> list:
+    pdfs = sorted(DOCS_PATH.glob("*.pdf"))
+    tenant_ids = []
+    for i in range(count):
+        tenant_id = f"tenant_{i:04d}"
+        tenant_dir = root / tenant_id
+        tenant_dir.mkdir(parents=True)
+        for j in range(docs_per_tenant):
+            pdf = pdfs[(i * docs_per_tenant + j) % len(pdfs)]
+            (tenant_dir / pdf.name).symlink_to(pdf)
+        tenant_ids.append(tenant_id)
+    return tenant_ids
+
+
+def timed_query(registry: TenantRegistry, tenant_id: str) -> float:
+    start = time.perf_counter()
+    registry.get(tenant_id).retrieve(QUERY)
+    return (time.perf_counter() - start) * 1000
+
+
+def latency(values: list) -> dict:
+    return {"p50": run_eval.percentile(values, 50), "p95": run_eval.percentile(values, 95), "count": len(values)}
+
+
+def measure(default: RetrievalService, count: int, max_resident: int, docs_per_tenant: int, queries: int, seed: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        tenants_dir, index_dir = Path(tmp) / "tenants", Path(tmp) / "index"
+        tenant_ids = make_tenants(tenants_dir, count, docs_per_tenant)
+
+        def registry() -> TenantRegistry:
+            return TenantRegistry(default, tenants_dir=str(tenants_dir), max_resident=max_resident, index_dir=str(index_dir))
+
+        build = [timed_query(registry(), t) for t in tenant_ids]
+
+        # A fresh registry is a restart: every index is on disk, none in memory.
+        restarted = registry()
+        cold_load = [timed_query(restarted, t) for t in tenant_ids]
+        resident = restarted.metrics()["resident"]
+        warm = [timed_query(restarted, t) for t in resident for _ in range(5)]
+
+        rng = np.random.default_rng(seed)
+        weights = 1.0 / np.arange(1, count + 1) ** 1.1
+        mixed, resident_hits = [], 0
+        for index in rng.choice(count, size=queries, p=weights / weights.sum()):
+            tenant_id = tenant_ids[index]
+            resident_hits += tenant_id in restarted.metrics()["resident"]
+            mixed.append(timed_query(restarted, tenant_id))
+
+    return {
+        "tenants": count,
+        "max_resident": max_resident,
+        "build_ms": latency(build),
+        "cold_load_ms": latency(cold_load),
+        "warm_ms": latency(warm),
+        "mixed_ms": latency(mixed),
+        "mixed_resident_hit_ratio": round(resident_hits / queries, 3) if queries else None,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark tenant index cold loads vs. warm queries")
+    ap.add_argument("--tenants", default="1,4,16,64", help="Comma-separated tenant counts")
+    ap.add_argument("--max-resident", type=int, default=Config.MAX_RESIDENT_TENANTS)
+    ap.add_argument("--docs-per-tenant", type=int, default=3)
+    ap.add_argument("--queries", type=int, default=300, help="Queries in the Zipf-mixed phase")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--output", "-o", default="", help="Write results JSON to this file")
+    args = ap.parse_args()
+
+    print(f"Loading {Config.EMBEDDING_MODEL}...")
+    default = RetrievalService(docs_path=str(DOCS_PATH))
+    results = []
+    print("| tenants | resident | build p50 (ms) | cold load p50 (ms) | warm p50 (ms) | mixed p50 (ms) | mixed p95 (ms) | resident hit % |")
+    print("|---------|----------|----------------|--------------------|---------------|----------------|----------------|----------------|")
+    for count in (int(n) for n in args.tenants.split(",") if n.strip()):
+        r = measure(default, count, args.max_resident, args.docs_per_tenant, args.queries, args.seed)
+        results.append(r)
+        print(
+            f"| {count} | {min(count, args.max_resident)} | {r['build_ms']['p50']} | {r['cold_load_ms']['p50']} | "
+            f"{r['warm_ms']['p50']} | {r['mixed_ms']['p50']} | {r['mixed_ms']['p95']} | {round(100 * r['mixed_resident_hit_ratio'], 1)} |"
+        )
+
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"cpu_count": os.cpu_count(), "results": results}, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
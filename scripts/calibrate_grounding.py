@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Calibrate GROUNDING_THRESHOLD on real answers before turning GROUNDING_ENABLED on.
+
+Each question (eval_cases.json plus an optional --questions file) is retrieved,
+routed, and answered by the configured LLM the way /query does it. Every answer
+sentence is then scored (best cosine similarity, as GroundingEvaluator computes
+it) against two chunk sets:
+  own    the chunks retrieved for that question; the answer was written from
+         them, so these sentences should count as supported
+  other  the chunks retrieved for the least similar other question; off-topic,
+         so these sentences should count as unsupported
+The suggested threshold is the one that best separates the two (max TPR - FPR),
+reported with how many real answers each threshold would flag "ungrounded".
+
+Chunk vectors only cover the first ~256 word-pieces of each chunk (the MiniLM
+input limit), so a correct sentence drawn from the end of a long chunk scores
+low. The "own" distribution includes those sentences; that is why the threshold
+has to come from this run with the real model rather than a guess.
+
+Needs the real embedding model and LLM_PROVIDER=groq (stub answers are random
+words and would calibrate nothing).
+
+Usage (from project root):
+  python scripts/calibrate_grounding.py --output grounding_calibration.json
+  python scripts/calibrate_grounding.py --questions faq.txt
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import run_eval  # noqa: E402
+from config import Config  # noqa: E402
+
+REPORT_THRESHOLDS = (0.2, 0.3, 0.4, 0.5, 0.6)
+
+
+def rates(own: np.ndarray, other: np.ndarray, answers: list, threshold: float) -> dict:
+    return {
+        "threshold": round(threshold, 2),
+        "supported_own": round(float(np.mean(own >= threshold)), 4),
+        "supported_other": round(float(np.mean(other >= threshold)), 4),
+        "answers_flagged": round(float(np.mean([min(a) < threshold for a in answers])), 4),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Calibrate the grounding threshold")
+    ap.add_argument("--cases", default=str(run_eval.DEFAULT_CASES))
+    ap.add_argument("--questions", default="", help="Text file with one extra question per line")
+    ap.add_argument("--output", "-o", default="", help="Write results JSON to this file")
+    args = ap.parse_args()
+
+    if Config.LLM_PROVIDER != "groq":
+        print(f"Error: calibration needs real answers, got LLM_PROVIDER={Config.LLM_PROVIDER}", file=sys.stderr)
+        sys.exit(1)
+
+    questions = [c["query"] for c in run_eval.load_cases(args.cases)]
+    if args.questions:
+        questions += [line.strip() for line in Path(args.questions).read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    import main as server
+    from evaluation.grounding_evaluator import GroundingEvaluator
+
+    print(f"Loading index ({Config.EMBEDDING_MODEL})...")
+    server.retriever.load()
+    grounding = GroundingEvaluator(encode=server.retriever.encode)
+
+    query_vectors = server.retriever.encode(questions)
+    retrieved = server.retriever.search(query_vectors, with_embeddings=True)
+    answers = []
+    for i, question in enumerate(questions):
+        chunks = retrieved[i]
+        classification, model_name = server.router.classify(question, query_embedding=query_vectors[i], retrieved_chunks=chunks)
+        answer, _, _ = server.llm_service.generate(
+            model=model_name,
+            context="\n\n".join(c["text"] for c in chunks),
+            question=question,
+            classification=classification,
+        )
+        if "refusal" in server.evaluator.evaluate(answer, chunks):
+            continue
+        answers.append((i, answer))
+
+    norms = query_vectors / np.maximum(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12)
+    query_similarity = norms @ norms.T
+    np.fill_diagonal(query_similarity, np.inf)
+    own, other, per_answer = [], [], []
+    for i, answer in answers:
+        scores = [s for _, s in grounding.sentence_scores(answer, retrieved[i])]
+        if not scores:
+            continue
+        own += scores
+        per_answer.append(scores)
+        other += [s for _, s in grounding.sentence_scores(answer, retrieved[int(query_similarity[i].argmin())])]
+    if not own or not other:
+        print("Error: no answer sentences to score", file=sys.stderr)
+        sys.exit(1)
+    own, other = np.array(own), np.array(other)
+
+    grid = np.round(np.arange(0.0, 1.0, 0.01), 2)
+    separation = [np.mean(own >= t) - np.mean(other >= t) for t in grid]
+    suggested = float(grid[int(np.argmax(separation))])
+
+    print(f"{len(per_answer)} answers, {len(own)} sentences, model {Config.EMBEDDING_MODEL}")
+    print("| threshold | own sentences supported | off-topic sentences supported | answers flagged ungrounded |")
+    print("|-----------|-------------------------|-------------------------------|----------------------------|")
+    rows = [rates(own, other, per_answer, t) for t in sorted(set(REPORT_THRESHOLDS) | {suggested})]
+    for r in rows:
+        marker = " (suggested)" if r["threshold"] == suggested else ""
+        print(f"| {r['threshold']}{marker} | {r['supported_own']} | {r['supported_other']} | {r['answers_flagged']} |")
+
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "embedding_model": Config.EMBEDDING_MODEL,
+            "answers": len(per_answer),
+            "sentences": len(own),
+            "suggested_threshold": suggested,
+            "thresholds": rows,
+            "own_percentiles": {p: round(float(np.percentile(own, p)), 4) for p in (5, 25, 50)},
+            "other_percentiles": {p: round(float(np.percentile(other, p)), 4) for p in (50, 75, 95)},
+        }, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Compare index storage modes (EMBEDDING_STORAGE): float32, float16, int8.
+
+Builds the clearpath_docs index once per mode through RetrievalService (the
+same build, persist, and memory-mapped reload path as the server) and reports
+for each:
+  recall@k    overlap of the mode's top-k chunks with float32's, per eval case query
+  top1        fraction of queries whose best chunk matches float32's
+  memory      index size in bytes (total and per vector)
+  search      single-query FAISS search latency, query encoding excluded
+
+clearpath_docs is small, so --synthetic N also builds N random vectors per mode
+to show memory and search latency at the corpus sizes where storage matters
+(recall is only meaningful on the real corpus).
+
+Usage (from project root):
+  python scripts/compare_storage.py
+  python scripts/compare_storage.py --synthetic 200000 --output storage.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPT_DIR.parent
+DOCS_PATH = ROOT_DIR / "clearpath_docs"
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import faiss  # noqa: E402
+
+import run_eval  # noqa: E402
+from config import Config  # noqa: E402
+from rag.retrieval_service import EMBEDDING_STORAGE_TYPES, RetrievalService  # noqa: E402
+
+
+def index_bytes(index) -> int:
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def search_latency_us(index, queries: np.ndarray, k: int, min_time: float) -> dict:
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(timings) < len(queries):
+        query = queries[len(timings) % len(queries)][None, :]
+        start = time.perf_counter_ns()
+        index.search(query, k)
+        timings.append((time.perf_counter_ns() - start) / 1000)
+    timings.sort()
+    return {
+        "p50_us": round(timings[len(timings) // 2], 1),
+        "p95_us": round(timings[max(0, math.ceil(0.95 * len(timings)) - 1)], 1),
+    }
+
+
+def synthetic_index(mode: str, vectors: np.ndarray):
+    quantizer_type = EMBEDDING_STORAGE_TYPES[mode]
+    if quantizer_type is None:
+        index = faiss.IndexFlatL2(vectors.shape[1])
+    else:
+        index = faiss.IndexScalarQuantizer(vectors.shape[1], quantizer_type, faiss.METRIC_L2)
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare float32/float16/int8 index storage")
+    ap.add_argument("--cases", default=str(run_eval.DEFAULT_CASES))
+    ap.add_argument("--k", type=int, default=Config.TOP_K)
+    ap.add_argument("--synthetic", type=int, default=0, help="Also measure memory/latency on this many random vectors")
+    ap.add_argument("--min-time", type=float, default=1.0, help="Seconds of search timing per mode")
+    ap.add_argument("--output", "-o", default="", help="Write results JSON to this file")
+    args = ap.parse_args()
+
+    queries = [c["query"] for c in run_eval.load_cases(args.cases)]
+    modes = list(EMBEDDING_STORAGE_TYPES)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = None
+        for mode in modes:
+            retriever = RetrievalService(
+                docs_path=str(DOCS_PATH),
+                autoload=False,
+                index_dir=str(Path(tmp) / mode),
+                embedding_model=baseline.embedding_model if baseline else None,
+                embedding_storage=mode,
+            )
+            retriever.load()
+            if baseline is None:
+                baseline = retriever
+                query_vectors = retriever.encode(queries).astype(np.float32)
+                _, truth = retriever.index.search(query_vectors, args.k)
+
+            _, found = retriever.index.search(query_vectors, args.k)
+            recall = [
+                len(set(f[f >= 0]) & set(t[t >= 0])) / max(1, len(t[t >= 0]))
+                for f, t in zip(found, truth)
+            ]
+            size = index_bytes(retriever.index)
+            results[mode] = {
+                "vectors": retriever.index_size,
+                "recall_at_k": round(float(np.mean(recall)), 4),
+                "min_recall_at_k": round(float(np.min(recall)), 4),
+                "top1_agreement": round(float(np.mean(found[:, 0] == truth[:, 0])), 4),
+                "index_bytes": size,
+                "bytes_per_vector": round(size / max(1, retriever.index_size), 1),
+                "search": search_latency_us(retriever.index, query_vectors, args.k, args.min_time),
+            }
+
+    if args.synthetic:
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((args.synthetic, query_vectors.shape[1])).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        for mode in modes:
+            index = synthetic_index(mode, vectors)
+            size = index_bytes(index)
+            results[mode]["synthetic"] = {
+                "vectors": args.synthetic,
+                "index_mb": round(size / 2**20, 1),
+                "search": search_latency_us(index, query_vectors, args.k, args.min_time),
+            }
+
+    print(f"{len(queries)} eval queries, k={args.k}, recall measured against float32")
+    print("| storage | recall@k | min recall@k | top-1 agreement | index bytes | bytes/vector | search p50 (us) | search p95 (us) |")
+    print("|---------|----------|--------------|-----------------|-------------|--------------|-----------------|-----------------|")
+    for mode, r in results.items():
+        print(
+            f"| {mode} | {r['recall_at_k']} | {r['min_recall_at_k']} | {r['top1_agreement']} | {r['index_bytes']} | "
+            f"{r['bytes_per_vector']} | {r['search']['p50_us']} | {r['search']['p95_us']} |"
+        )
+    if args.synthetic:
+        print(f"\nSynthetic corpus: {args.synthetic} vectors")
+        print("| storage | index (MB) | search p50 (us) | search p95 (us) |")
+        print("|---------|------------|-----------------|-----------------|")
+        for mode, r in results.items():
+            s = r["synthetic"]
+            print(f"| {mode} | {s['index_mb']} | {s['search']['p50_us']} | {s['search']['p95_us']} |")
+
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"k": args.k, "queries": len(queries), "results": results}, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
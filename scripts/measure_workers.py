@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Memory and throughput comparison across worker counts.
+
+For each worker count, starts the backend with the stub LLM (no Groq, zero
+simulated LLM latency, so throughput reflects embedding + search + serving),
+waits for /ready, records resident memory of the whole process tree, then runs
+the run_eval.py load benchmark with uncached, non-streaming requests.
+
+Modes:
+  prefork  gunicorn -c gunicorn.conf.py (model loaded before fork, index mmapped)
+  uvicorn  uvicorn --workers N (each worker loads its own model)
+
+Usage (from project root; Linux only, reads /proc):
+  python scripts/measure_workers.py
+  python scripts/measure_workers.py --workers 1,2,4,8 --mode uvicorn --duration 30 --output workers.json
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "backend"
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import run_eval  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def process_tree(root_pid: int) -> list:
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    pids, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, []))
+    return pids
+
+
+def memory_mb(root_pid: int) -> dict:
+    """Sum RSS (double-counts shared pages) and PSS (shared pages split between sharers) over the tree."""
+    rss = pss = 0
+    pids = process_tree(root_pid)
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except OSError:
+            continue
+    return {"processes": len(pids), "rss_mb": round(rss / 1024, 1), "pss_mb": round(pss / 1024, 1)}
+
+
+def wait_ready(base_url: str, timeout_s: float) -> float:
+    start = time.monotonic()
+    while time.monotonic() - start < timeout_s:
+        try:
+            with urllib.request.urlopen(base_url + "/ready", timeout=5) as resp:
+                if resp.status == 200:
+                    return time.monotonic() - start
+        except Exception:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{base_url} not ready after {timeout_s:.0f}s")
+
+
+def wait_workers(root_pid: int, workers: int, timeout_s: float) -> None:
+    """/ready answers as soon as one worker is up; wait for the rest before measuring memory."""
+    deadline = time.monotonic() + timeout_s
+    while len(process_tree(root_pid)) < workers + 1 and time.monotonic() < deadline:
+        time.sleep(0.5)
+
+
+def start_server(mode: str, workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, LLM_PROVIDER="stub", STUB_TTFT_MS="0", STUB_TOKENS_PER_SEC="0", PORT=str(port), WEB_CONCURRENCY=str(workers))
+    if mode == "prefork":
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"]
+    else:
+        env.setdefault("TORCH_THREADS", str(max(1, (os.cpu_count() or 1) // workers)))
+        cmd = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers)]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def measure(mode: str, workers: int, duration: float, concurrency: int, ready_timeout: float, cases: list) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    proc = start_server(mode, workers, port)
+    try:
+        ready_s = wait_ready(base_url, ready_timeout)
+        wait_workers(proc.pid, workers, ready_timeout)
+        idle = memory_mb(proc.pid)
+        run_eval.API_URL = base_url + "/query"
+        run_eval.STREAM_API_URL = run_eval.API_URL + "/stream"
+        mix = {"cached": 0.0, "complex": 0.3, "stream": 0.0}
+        report = run_eval.run_benchmark(cases, concurrency, duration, mix, seed=0, warmup=False)
+        loaded = memory_mb(proc.pid)
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=30)
+    overall = report["overall"]
+    return {
+        "mode": mode,
+        "workers": workers,
+        "concurrency": concurrency,
+        "ready_s": round(ready_s, 1),
+        "memory_idle": idle,
+        "memory_under_load": loaded,
+        "throughput_rps": overall["throughput_rps"],
+        "latency_ms": overall["latency_ms"],
+        "error_rate": overall["error_rate"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare memory and throughput across worker counts")
+    ap.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    ap.add_argument("--mode", choices=("prefork", "uvicorn"), default="prefork")
+    ap.add_argument("--duration", type=float, default=20.0, help="Load seconds per worker count")
+    ap.add_argument("--clients-per-worker", type=int, default=2, help="Concurrent clients per worker")
+    ap.add_argument("--ready-timeout", type=float, default=300.0)
+    ap.add_argument("--cases", default=str(run_eval.DEFAULT_CASES))
+    ap.add_argument("--output", "-o", default="", help="Write results JSON to this file")
+    args = ap.parse_args()
+
+    cases = run_eval.load_cases(args.cases)
+    results = []
+    print("| mode | workers | ready (s) | RSS idle (MB) | PSS idle (MB) | PSS load (MB) | req/s | p50 (ms) | p95 (ms) |")
+    print("|------|---------|-----------|---------------|---------------|---------------|-------|----------|----------|")
+    for workers in (int(w) for w in args.workers.split(",") if w.strip()):
+        r = measure(args.mode, workers, args.duration, workers * args.clients_per_worker, args.ready_timeout, cases)
+        results.append(r)
+        print(
+            f"| {r['mode']} | {workers} | {r['ready_s']} | {r['memory_idle']['rss_mb']} | {r['memory_idle']['pss_mb']} | "
+            f"{r['memory_under_load']['pss_mb']} | {r['throughput_rps']} | {r['latency_ms']['p50']} | {r['latency_ms']['p95']} |"
+        )
+
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"cpu_count": os.cpu_count(), "results": results}, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
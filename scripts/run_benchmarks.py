@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+In-process microbenchmarks for the backend hot paths. No server and no network:
+the LLM is StubLLMService with zero simulated latency, so timings are pure CPU.
+Retrieval needs the all-MiniLM-L6-v2 model in the local Hugging Face cache
+(set HF_HUB_OFFLINE=1 in CI once it is cached).
+
+Each benchmark calls its function repeatedly for --min-time seconds and reports
+per-call mean/min/p50/p95 in microseconds. With --compare, exits non-zero when a
+benchmark's p50 regresses by more than --max-regression against a saved run.
+
+Usage (from project root):
+  python scripts/run_benchmarks.py
+  python scripts/run_benchmarks.py --output bench_baseline.json
+  python scripts/run_benchmarks.py --compare bench_baseline.json --max-regression 1.25
+  python scripts/run_benchmarks.py --only router,cache --no-retrieval
+"""
+
+import argparse
+import itertools
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from config import Config  # noqa: E402
+from evaluation.grounding_evaluator import GroundingEvaluator  # noqa: E402
+from evaluation.response_evaluator import ResponseEvaluator  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+from llm.stub_llm_service import StubLLMService  # noqa: E402
+from logger import RoutingLogger  # noqa: E402
+from models import BatchQueryRequest, Metadata, QueryRequest, QueryResponse, Source, TokenUsage  # noqa: E402
+from routing.EmbeddingRouter import EmbeddingRouter  # noqa: E402
+from routing.RuleBasedRouter import RuleBasedRouter  # noqa: E402
+from services.cache_service import CacheService  # noqa: E402
+from services.conversation_store import ConversationStore  # noqa: E402
+from services.query_service import QueryService  # noqa: E402
+from services.stream_frames import StreamFrames, sse_frame  # noqa: E402
+
+DOCS_PATH = ROOT_DIR / "clearpath_docs"
+SHORT_QUERY = "What is the price of the Pro plan?"
+LONG_QUERY = (
+    "I keep getting an error when my Slack integration tries to sync tasks from the "
+    "marketing project, can you walk me through what to check and why it happens?"
+)
+
+
+def bench(fn, min_time: float, warmup: int = 3) -> dict:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while True:
+        start = time.perf_counter_ns()
+        fn()
+        timings.append((time.perf_counter_ns() - start) / 1000)
+        if time.perf_counter() >= deadline and len(timings) >= 5:
+            break
+    timings.sort()
+    return {
+        "rounds": len(timings),
+        "mean_us": round(sum(timings) / len(timings), 2),
+        "min_us": round(timings[0], 2),
+        "p50_us": round(timings[len(timings) // 2], 2),
+        "p95_us": round(timings[max(0, math.ceil(0.95 * len(timings)) - 1)], 2),
+    }
+
+
+def sample_chunks(n: int = Config.TOP_K) -> list:
+    return [
+        {"text": f"chunk {i} about plans and pricing", "document": f"{i:02d}_Doc.pdf", "page": 1, "relevance_score": 0.3 + i / 50}
+        for i in range(n)
+    ]
+
+
+def synthetic_phrases(n: int) -> list:
+    """Deterministic tenant-style phrases that do not occur in normal answers."""
+    return [f"tenant phrase {i} zq{i * 7919 % 10007}" for i in range(n)]
+
+
+def build_benchmarks(args, workdir: Path) -> dict:
+    """Name -> zero-arg callable. Setup cost is paid here, not inside the timed call."""
+    router = RuleBasedRouter()
+    evaluator = ResponseEvaluator()
+    chunks = sample_chunks()
+    answer = "According to the Pricing Sheet, the Pro plan costs $12 per user per month. " * 5
+    long_answer = (
+        "To configure the integration, open Settings, choose Integrations, and follow the steps "
+        "described in the Integrations Catalog; repeat for each workspace. "
+    ) * 40
+
+    cache = CacheService()
+    cache.set(SHORT_QUERY, QueryResponse(
+        answer=answer,
+        metadata=Metadata(
+            model_used=Config.SMALL_MODEL,
+            classification="simple",
+            tokens=TokenUsage(input_tokens=900, output_tokens=120),
+            latency_ms=800,
+            chunks_retrieved=len(chunks),
+            evaluator_flags=[],
+        ),
+        sources=[Source(document=c["document"], page=c["page"], relevance_score=c["relevance_score"]) for c in chunks],
+        conversation_id="conv_bench",
+    ))
+    benchmarks = {
+        "router.classify.short": lambda: router.classify(SHORT_QUERY),
+        "router.classify.long": lambda: router.classify(LONG_QUERY),
+        "evaluator.evaluate": lambda: evaluator.evaluate(answer, chunks),
+        "evaluator.evaluate.long_answer": lambda: evaluator.evaluate(long_answer, chunks),
+        "cache.get.hit": lambda: cache.get(SHORT_QUERY),
+        "cache.get.miss": lambda: cache.get("never cached"),
+    }
+
+    # Serialization per /query/stream cache hit: the old per-hit model_dump path vs. replaying stored frames.
+    cached = cache.get(SHORT_QUERY)
+    frames = StreamFrames.from_response(cached)
+
+    def sse_hit_model_dump():
+        meta = cached.metadata.model_copy(update={"cache_hit": True})
+        return (
+            sse_frame({"type": "chunk", "content": cached.answer})
+            + sse_frame({"type": "done", "metadata": meta.model_dump(), "sources": [s.model_dump() for s in cached.sources], "conversation_id": "conv_bench"})
+        )
+
+    benchmarks.update({
+        "sse.cache_hit.model_dump": sse_hit_model_dump,
+        "sse.cache_hit.frames": lambda: "".join(frames.replay("conv_bench")),
+        "sse.frames.build": lambda: StreamFrames.from_response(cached),
+    })
+
+    # Learned router on a synthetic model: routing must stay far below a millisecond.
+    dim = 384
+    rng = np.random.default_rng(0)
+    model_file = workdir / "router_model.npz"
+    np.savez(
+        model_file,
+        weights=rng.standard_normal(dim + 4), bias=0.0, mean=np.zeros(dim + 4), scale=np.ones(dim + 4),
+        model_stats=json.dumps({
+            Config.SMALL_MODEL: {"latency_ms": 700.0, "tokens": 1000.0},
+            Config.BIG_MODEL: {"latency_ms": 2500.0, "tokens": 1300.0},
+        }),
+    )
+    embedding_router = EmbeddingRouter(model_path=str(model_file))
+    query_embedding = rng.standard_normal(dim).astype(np.float32)
+    benchmarks["router.embedding.classify"] = lambda: embedding_router.classify(SHORT_QUERY, query_embedding, chunks)
+
+    # Grounding without the model: sentence split + similarity + attribution only, encoder cost excluded.
+    embedded_chunks = [dict(c, embedding=rng.standard_normal(dim).astype(np.float32)) for c in chunks]
+    sentence_vectors = rng.standard_normal((64, dim)).astype(np.float32)
+    synthetic_grounding = GroundingEvaluator(encode=lambda sentences: sentence_vectors[:len(sentences)])
+    benchmarks["grounding.check.no_encoder"] = lambda: synthetic_grounding.check(answer, embedded_chunks)
+
+    # Keyword scanning with large, tenant-sized lists: one compiled pass vs. one substring scan per phrase.
+    for size in (500,):
+        phrases = ResponseEvaluator.REFUSAL_PHRASES + synthetic_phrases(size)
+        keywords_file = workdir / f"keywords_{size}.json"
+        keywords_file.write_text(json.dumps({"complex": synthetic_phrases(size), "refusal": synthetic_phrases(size)}))
+        big_router = RuleBasedRouter(keywords_path=str(keywords_file))
+        big_evaluator = ResponseEvaluator(keywords_path=str(keywords_file))
+        matcher = KeywordMatcher({"refusal": phrases})
+        text = long_answer.lower()
+        benchmarks.update({
+            f"keywords.any_scan.{size}.long_answer": lambda phrases=phrases, text=text: any(p in text for p in phrases),
+            f"keywords.matcher.{size}.long_answer": lambda matcher=matcher, text=text: matcher.categories(text),
+            f"router.classify.{size}_keywords": lambda big_router=big_router: big_router.classify(SHORT_QUERY + " for my team"),
+            f"evaluator.evaluate.{size}_keywords.long_answer": lambda big_evaluator=big_evaluator: big_evaluator.evaluate(long_answer, chunks),
+        })
+
+    # Logger rewrites the whole file per call, so cost depends on how many entries it already holds.
+    for size in (0, 1000):
+        log_file = workdir / f"routing_logs_{size}.json"
+        log_file.write_text(json.dumps([
+            {"query": SHORT_QUERY, "classification": "simple", "model_used": Config.SMALL_MODEL,
+             "tokens_input": 900, "tokens_output": 120, "latency_ms": 800}
+        ] * size))
+        routing_logger = RoutingLogger(log_file=str(log_file))
+        benchmarks[f"logger.log.{size}_entries"] = (
+            lambda routing_logger=routing_logger: routing_logger.log(SHORT_QUERY, "simple", Config.SMALL_MODEL, 900, 120, 800)
+        )
+
+    if args.no_retrieval:
+        return benchmarks
+
+    from rag.retrieval_service import RetrievalService
+
+    retriever = RetrievalService(docs_path=str(DOCS_PATH))
+    benchmarks["retrieval.retrieve"] = lambda: retriever.retrieve(SHORT_QUERY)
+    benchmarks["retrieval.retrieve_batch.32"] = lambda: retriever.retrieve_batch([f"{SHORT_QUERY} {i}" for i in range(32)])
+
+    grounding = GroundingEvaluator(encode=retriever.encode)
+    grounded_chunks = retriever.search(retriever.encode([SHORT_QUERY]), with_embeddings=True)[0]
+    benchmarks["grounding.check"] = lambda: grounding.check(answer, grounded_chunks)
+    benchmarks["grounding.check.long_answer"] = lambda: grounding.check(long_answer, grounded_chunks)
+
+    service = QueryService(
+        router=router,
+        retriever=retriever,
+        llm=StubLLMService(ttft_ms=0, tokens_per_sec=0, output_tokens=Config.STUB_OUTPUT_TOKENS),
+        evaluator=evaluator,
+        cache=CacheService(),
+        conversation_store=ConversationStore(),
+        logger=RoutingLogger(log_file=str(workdir / "query_service_logs.json")),
+        grounding=grounding if Config.GROUNDING_ENABLED else None,
+    )
+    service.handle_query(QueryRequest(question=SHORT_QUERY))
+    unique = itertools.count()
+
+    def query_miss():
+        service.handle_query(QueryRequest(question=f"{SHORT_QUERY} #{next(unique)}"))
+
+    # Streams ground in a background thread after closing; a service with grounding would leave
+    # those checks running (and skewing) the benchmarks that follow, so the stream path runs without it.
+    stream_service = QueryService(
+        router=router,
+        retriever=retriever,
+        llm=service.llm,
+        evaluator=evaluator,
+        cache=service.cache,
+        conversation_store=ConversationStore(),
+        logger=service.logger,
+    )
+
+    def stream_miss():
+        for _ in stream_service.handle_query_stream(QueryRequest(question=f"{SHORT_QUERY} #{next(unique)}")):
+            pass
+
+    def stream_hit():
+        for _ in stream_service.handle_query_stream(QueryRequest(question=SHORT_QUERY)):
+            pass
+
+    def batch_miss():
+        n = next(unique)
+        for _ in service.handle_batch(BatchQueryRequest(questions=[f"{SHORT_QUERY} #{n}-{i}" for i in range(8)])):
+            pass
+
+    benchmarks.update({
+        "query_service.handle_query.hit": lambda: service.handle_query(QueryRequest(question=SHORT_QUERY)),
+        "query_service.handle_query.miss": query_miss,
+        "query_service.handle_query_stream.hit": stream_hit,
+        "query_service.handle_query_stream.miss": stream_miss,
+        "query_service.handle_batch.miss.8": batch_miss,
+    })
+    return benchmarks
+
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> list:
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))["benchmarks"]
+    regressions = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        ratio = stats["p50_us"] / baseline[name]["p50_us"] if baseline[name]["p50_us"] else 1.0
+        stats["vs_baseline"] = round(ratio, 3)
+        if ratio > max_regression:
+            regressions.append(f"{name}: p50 {baseline[name]['p50_us']}us -> {stats['p50_us']}us ({ratio:.2f}x)")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run in-process backend microbenchmarks")
+    ap.add_argument("--min-time", type=float, default=0.5, help="Seconds to run each benchmark")
+    ap.add_argument("--only", default="", help="Comma-separated substrings; run matching benchmarks only")
+    ap.add_argument("--no-retrieval", action="store_true", help="Skip benchmarks that need the embedding model")
+    ap.add_argument("--output", "-o", default="", help="Write results JSON to this file")
+    ap.add_argument("--compare", default="", help="Baseline results JSON to compare against")
+    ap.add_argument("--max-regression", type=float, default=1.25, help="Allowed p50 ratio vs. baseline")
+    args = ap.parse_args()
+
+    filters = [f.strip() for f in args.only.split(",") if f.strip()]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in build_benchmarks(args, Path(tmp)).items():
+            if filters and not any(f in name for f in filters):
+                continue
+            results[name] = bench(fn, args.min_time)
+            s = results[name]
+            print(f"{name:<45} rounds={s['rounds']:<7} mean={s['mean_us']:>10}us p50={s['p50_us']:>10}us p95={s['p95_us']:>10}us")
+
+    regressions = compare(results, args.compare, args.max_regression) if args.compare else []
+
+    if args.output:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "created_at": int(time.time()),
+            "benchmarks": results,
+        }
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
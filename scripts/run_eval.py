@@ -1,23 +1,40 @@
 #!/usr/bin/env python3
 """
 Eval harness: run test queries against the ClearPath API and report pass/fail.
-Expects backend running at API_URL. Uses POST /query (non-streaming).
+Expects backend running at API_URL. Uses POST /query (non-streaming), or one
+POST /query/batch for all cases with --batch.
+
+With --benchmark, replays the cases as concurrent load instead and reports
+latency percentiles, time-to-first-token, throughput, error rate, and
+cache-hit ratio as JSON.
 
 Usage (from project root):
   python scripts/run_eval.py
   python scripts/run_eval.py --output eval_report.md
+  python scripts/run_eval.py --batch
+  python scripts/run_eval.py --benchmark --concurrency 8 --duration 60 \
+      --mix cached=0.5,complex=0.3,stream=0.5 --bench-output bench.json
 """
 
 import argparse
+import itertools
 import json
+import math
+import random
 import sys
+import threading
+import time
 import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 DEFAULT_CASES = SCRIPT_DIR / "eval_cases.json"
 API_URL = "http://localhost:8000/query"
+BATCH_API_URL = API_URL + "/batch"
+STREAM_API_URL = API_URL + "/stream"
+DEFAULT_MIX = {"cached": 0.5, "complex": 0.3, "stream": 0.5}
 REFUSAL_PHRASES = [
     "i cannot", "i can't", "i don't know", "i do not know", "not mentioned",
     "cannot find", "not available in the documentation", "not in the documentation",
@@ -53,20 +70,49 @@ def post_query(question: str) -> dict:
         return json.load(resp)
 
 
+def post_batch(questions: list) -> dict:
+    """POST all questions to /query/batch; returns {index: response-or-error-item} from the NDJSON stream."""
+    req = urllib.request.Request(
+        BATCH_API_URL,
+        data=json.dumps({"questions": questions}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    items = {}
+    with urllib.request.urlopen(req, timeout=90 + 10 * len(questions)) as resp:
+        for line in resp:
+            if line.strip():
+                item = json.loads(line)
+                items[item["index"]] = item
+    return items
+
+
 def check_refusal(answer: str) -> bool:
     low = answer.lower()
     return any(p in low for p in REFUSAL_PHRASES)
 
 
-def run_eval(cases: list, verbose: bool = True) -> list:
+def run_eval(cases: list, verbose: bool = True, batch: bool = False) -> list:
     results = []
-    for case in cases:
+    batch_items = {}
+    if batch:
+        try:
+            batch_items = post_batch([case.get("query", "") for case in cases])
+        except Exception as e:
+            batch_items = {i: {"error": str(e)} for i in range(len(cases))}
+    for i, case in enumerate(cases):
         q = case.get("query", "")
         expected_contains = case.get("expected_contains") or []
         expected_refusal = case.get("expected_refusal", False)
         case_id = case.get("id", "unknown")
         try:
-            data = post_query(q)
+            if batch:
+                item = batch_items.get(i) or {"error": "missing from batch response"}
+                if "error" in item:
+                    raise RuntimeError(item["error"])
+                data = item["response"]
+            else:
+                data = post_query(q)
         except Exception as e:
             results.append({
                 "id": case_id,
@@ -100,26 +146,248 @@ def run_eval(cases: list, verbose: bool = True) -> list:
                 "missing": missing if not passed else [],
                 "answer": answer[:200] + ("..." if len(answer) > 200 else ""),
             })
+        metadata = data.get("metadata") or {}
+        results[-1]["classification"] = metadata.get("classification")
+        results[-1]["model_used"] = metadata.get("model_used")
         if verbose:
             status = "PASS" if results[-1]["pass"] else "FAIL"
             print(f"{status} {case_id}: {q[:50]}...")
     return results
 
 
+def parse_mix(spec: str) -> dict:
+    """Parse "cached=0.5,complex=0.3,stream=0.5" into fractions, defaulting missing keys."""
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        key, _, value = part.partition("=")
+        if key not in DEFAULT_MIX:
+            raise ValueError(f"unknown mix key {key!r}; expected one of {sorted(DEFAULT_MIX)}")
+        fraction = float(value)
+        if not 0.0 <= fraction <= 1.0:
+            raise ValueError(f"mix fraction for {key!r} must be in [0, 1]")
+        mix[key] = fraction
+    return mix
+
+
+def post_stream(question: str) -> dict:
+    """POST /query/stream and consume the SSE stream; returns the done event plus time-to-first-token."""
+    req = urllib.request.Request(
+        STREAM_API_URL,
+        data=json.dumps({"question": question}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    start = time.perf_counter()
+    ttft_ms = None
+    with urllib.request.urlopen(req, timeout=90) as resp:
+        for raw in resp:
+            line = raw.decode("utf-8").strip()
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[6:])
+            if event.get("type") == "chunk" and ttft_ms is None:
+                ttft_ms = (time.perf_counter() - start) * 1000
+            elif event.get("type") == "done":
+                return {"metadata": event.get("metadata") or {}, "ttft_ms": ttft_ms}
+            elif event.get("type") == "error":
+                raise RuntimeError(event.get("message") or "stream error")
+    raise RuntimeError("stream ended without a done event")
+
+
+def pick_request(rng: random.Random, pools: dict, mix: dict, next_id) -> dict:
+    """Choose one request according to the mix; uncached requests get a unique suffix to defeat the cache."""
+    kind = "complex" if pools["complex"] and (not pools["simple"] or rng.random() < mix["complex"]) else "simple"
+    question = rng.choice(pools[kind])
+    cached = rng.random() < mix["cached"]
+    if not cached:
+        question = f"{question} (ref {next_id()})"
+    return {"question": question, "kind": kind, "cached": cached, "stream": rng.random() < mix["stream"]}
+
+
+def send_request(plan: dict) -> dict:
+    start = time.perf_counter()
+    sample = {"kind": plan["kind"], "cached_requested": plan["cached"], "stream": plan["stream"], "ttft_ms": None}
+    try:
+        if plan["stream"]:
+            data = post_stream(plan["question"])
+            sample["ttft_ms"] = data["ttft_ms"]
+        else:
+            data = post_query(plan["question"])
+        metadata = data.get("metadata") or {}
+        sample.update({
+            "ok": True,
+            "classification": metadata.get("classification", "unknown"),
+            "model_used": metadata.get("model_used", "unknown"),
+            "cache_hit": bool(metadata.get("cache_hit")),
+        })
+    except Exception as e:
+        sample.update({"ok": False, "error": str(e), "classification": "error", "model_used": "error", "cache_hit": False})
+    sample["latency_ms"] = (time.perf_counter() - start) * 1000
+    return sample
+
+
+def percentile(values: list, pct: float):
+    """Nearest-rank percentile; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return round(ordered[rank - 1], 2)
+
+
+def summarize(samples: list, elapsed_s: float) -> dict:
+    latencies = [s["latency_ms"] for s in samples if s["ok"]]
+    ttfts = [s["ttft_ms"] for s in samples if s["ok"] and s["ttft_ms"] is not None]
+    ok = [s for s in samples if s["ok"]]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        "cache_hit_ratio": round(sum(1 for s in ok if s["cache_hit"]) / len(ok), 4) if ok else 0.0,
+        "latency_ms": {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95), "p99": percentile(latencies, 99)},
+        "ttft_ms": {"p50": percentile(ttfts, 50), "p95": percentile(ttfts, 95), "p99": percentile(ttfts, 99)},
+    }
+
+
+def run_benchmark(cases: list, concurrency: int, duration_s: float, mix: dict, seed: int, warmup: bool = True) -> dict:
+    pools = {"simple": [], "complex": []}
+    for case in cases:
+        pools["complex" if case.get("expected_classification") == "complex" else "simple"].append(case.get("query", ""))
+    if not pools["simple"] and not pools["complex"]:
+        raise ValueError("no cases to benchmark")
+
+    if warmup and mix["cached"] > 0:
+        # Prime the response cache so "cached" requests measure hits, not first-time misses.
+        for question in pools["simple"] + pools["complex"]:
+            try:
+                post_query(question)
+            except Exception as e:
+                print(f"Warm-up failed for {question[:40]!r}: {e}", file=sys.stderr)
+
+    samples = []
+    run_id = int(time.time())
+    ids = (f"{run_id}-{n}" for n in itertools.count())
+    ids_lock = threading.Lock()
+
+    def next_id() -> str:
+        with ids_lock:
+            return next(ids)
+
+    deadline = time.monotonic() + duration_s
+
+    def worker(worker_id: int) -> None:
+        rng = random.Random(seed + worker_id)
+        while time.monotonic() < deadline:
+            samples.append(send_request(pick_request(rng, pools, mix, next_id)))
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.monotonic() - start
+
+    breakdown = {}
+    for key_fn, name in (
+        (lambda s: f"{s['classification']}/{s['model_used']}", "by_route"),
+        (lambda s: "stream" if s["stream"] else "non_stream", "by_transport"),
+        (lambda s: "cached" if s["cached_requested"] else "uncached", "by_cache_request"),
+    ):
+        groups = {}
+        for sample in samples:
+            groups.setdefault(key_fn(sample), []).append(sample)
+        breakdown[name] = {key: summarize(group, elapsed) for key, group in sorted(groups.items())}
+
+    errors = {}
+    for sample in samples:
+        if not sample["ok"]:
+            errors[sample["error"]] = errors.get(sample["error"], 0) + 1
+
+    return {
+        "config": {
+            "api_url": API_URL,
+            "concurrency": concurrency,
+            "duration_s": duration_s,
+            "mix": mix,
+            "seed": seed,
+            "cases": len(cases),
+        },
+        "started_at": run_id,
+        "elapsed_s": round(elapsed, 2),
+        "overall": summarize(samples, elapsed),
+        **breakdown,
+        "errors": errors,
+    }
+
+
+def print_benchmark(report: dict) -> None:
+    def row(name, stats):
+        lat, ttft = stats["latency_ms"], stats["ttft_ms"]
+        return (
+            f"{name:<40} n={stats['requests']:<6} rps={stats['throughput_rps']:<7} err={stats['error_rate']:<6} "
+            f"hit={stats['cache_hit_ratio']:<6} p50={lat['p50']} p95={lat['p95']} p99={lat['p99']} "
+            f"ttft_p50={ttft['p50']} ttft_p95={ttft['p95']}"
+        )
+
+    print(row("overall", report["overall"]))
+    for section in ("by_route", "by_transport", "by_cache_request"):
+        for name, stats in report[section].items():
+            print(row(f"{section}:{name}", stats))
+    for message, count in report["errors"].items():
+        print(f"error x{count}: {message}")
+
+
 def main():
     ap = argparse.ArgumentParser(description="Run eval harness against ClearPath API")
     ap.add_argument("--cases", default=str(DEFAULT_CASES), help="Path to eval_cases.json")
     ap.add_argument("--output", "-o", default="", help="Write report to this file (e.g. eval_report.md)")
     ap.add_argument("--quiet", "-q", action="store_true", help="Less stdout")
+    ap.add_argument("--json-output", default="", help="Write per-case results as JSON (e.g. for scripts/train_router.py)")
+    ap.add_argument("--batch", action="store_true", help="Send all cases in one POST /query/batch request")
+    ap.add_argument("--base-url", default="", help="Backend base URL (default: http://localhost:8000)")
+    ap.add_argument("--benchmark", action="store_true", help="Run concurrent load instead of pass/fail checks")
+    ap.add_argument("--concurrency", type=int, default=4, help="Benchmark: concurrent clients")
+    ap.add_argument("--duration", type=float, default=30.0, help="Benchmark: seconds to run")
+    ap.add_argument("--mix", default="", help="Benchmark: fractions, e.g. cached=0.5,complex=0.3,stream=0.5")
+    ap.add_argument("--seed", type=int, default=0, help="Benchmark: RNG seed for the request mix")
+    ap.add_argument("--no-warmup", action="store_true", help="Benchmark: do not prime the cache first")
+    ap.add_argument("--bench-output", default="", help="Benchmark: write the JSON report to this file")
     args = ap.parse_args()
 
+    if args.base_url:
+        global API_URL, BATCH_API_URL, STREAM_API_URL
+        API_URL = args.base_url.rstrip("/") + "/query"
+        BATCH_API_URL = API_URL + "/batch"
+        STREAM_API_URL = API_URL + "/stream"
+
     cases = load_cases(args.cases)
-    print(f"Running {len(cases)} eval cases against {API_URL}...")
-    results = run_eval(cases, verbose=not args.quiet)
+    if args.benchmark:
+        try:
+            mix = parse_mix(args.mix)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(2)
+        print(f"Benchmarking {API_URL} for {args.duration:.0f}s with {args.concurrency} clients, mix={mix}...")
+        report = run_benchmark(cases, args.concurrency, args.duration, mix, args.seed, warmup=not args.no_warmup)
+        print_benchmark(report)
+        if args.bench_output:
+            path = Path(args.bench_output)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            print(f"Benchmark report written to {args.bench_output}")
+        sys.exit(0 if report["overall"]["requests"] and report["overall"]["errors"] == 0 else 1)
+
+    print(f"Running {len(cases)} eval cases against {BATCH_API_URL if args.batch else API_URL}...")
+    results = run_eval(cases, verbose=not args.quiet, batch=args.batch)
     passed = sum(1 for r in results if r["pass"])
     total = len(results)
     print(f"\nResults: {passed}/{total} passed")
 
+    if args.json_output:
+        path = Path(args.json_output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {args.json_output}")
+
     if args.output:
         lines = [
             "# Eval Harness Report",
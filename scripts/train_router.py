@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Train the EmbeddingRouter (ROUTER=embedding) from routing logs and eval outcomes.
+
+Label 1 means "needs BIG_MODEL". Labels come only from outcomes of SMALL_MODEL
+answers, never from which model the router picked:
+- Eval results (run_eval.py --json-output): a case answered by SMALL_MODEL that
+  passed is 0, one that failed is 1.
+- Routing log entries answered by SMALL_MODEL that carry evaluator_flags: 1 when
+  the answer was flagged refusal or ungrounded, otherwise 0. Entries flagged
+  no_context are skipped (retrieval failed; neither model would have helped).
+Entries answered by BIG_MODEL, and older entries without evaluator_flags, carry
+no outcome for the small model. So are entries not answered by Groq
+(llm_provider), e.g. stub-LLM load tests. Eval labels win when a query
+appears in both.
+
+Under the rules every rule-"complex" query went to BIG_MODEL, so the logs alone
+never label the queries the router exists to move. Unless --no-probe is given,
+up to --probe-limit logged or eval queries without an 8B outcome are answered
+with SMALL_MODEL here (Groq, same retrieval and prompt as the server) and
+labelled by the response evaluator (plus the grounding check when
+GROUNDING_ENABLED) the same way as log entries.
+
+Features are computed with RetrievalService (query embedding + relevance scores)
+exactly as at serving time. The model is a class-balanced logistic regression.
+The saved file also carries per-model mean latency and tokens from the logs,
+which the router reports as predicted savings.
+
+Usage (from project root):
+  python scripts/run_eval.py --json-output eval_results.json
+  python scripts/train_router.py --eval-results eval_results.json
+  python scripts/train_router.py --logs backend/logs/routing_logs.json --output backend/routing/router_model.npz
+  python scripts/train_router.py --no-probe   # no Groq calls; rule-complex queries stay unlabelled
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from config import Config  # noqa: E402
+from models import DEFAULT_TENANT, tenant_key  # noqa: E402
+from rag.retrieval_service import RetrievalService  # noqa: E402
+from routing.EmbeddingRouter import EmbeddingRouter, build_features  # noqa: E402
+from routing.RuleBasedRouter import RuleBasedRouter  # noqa: E402
+
+DEFAULT_LOGS = ROOT_DIR / "backend" / "logs" / "routing_logs.json"
+
+
+FAILED_FLAGS = {"refusal", "ungrounded"}
+
+
+def load_labels(logs: list, eval_results: list) -> dict:
+    labels = {}
+    for entry in logs:
+        query = (entry.get("query") or "").strip()
+        flags = entry.get("evaluator_flags")
+        if query and entry.get("model_used") == Config.SMALL_MODEL and flags is not None and "no_context" not in flags:
+            labels[query] = 1 if FAILED_FLAGS.intersection(flags) else 0
+    for result in eval_results:
+        query = (result.get("query") or "").strip()
+        if query and result.get("model_used") == Config.SMALL_MODEL and "error" not in result:
+            labels[query] = 0 if result.get("pass") else 1
+    return labels
+
+
+def probe_small(queries: list, retriever: RetrievalService) -> dict:
+    """Labels from SMALL_MODEL's answers to queries that have no 8B outcome yet."""
+    from evaluation.grounding_evaluator import GroundingEvaluator
+    from evaluation.response_evaluator import ResponseEvaluator
+    from llm.groq_llm_service import GroqLLMService
+
+    llm = GroqLLMService(api_key=Config.GROQ_API_KEY)
+    evaluator = ResponseEvaluator()
+    grounding = GroundingEvaluator(encode=retriever.encode) if Config.GROUNDING_ENABLED else None
+    rules = RuleBasedRouter()
+    labels = {}
+    for i, query in enumerate(queries, 1):
+        chunks = retriever.search(retriever.encode([query]), with_embeddings=grounding is not None)[0]
+        try:
+            answer, _, _ = llm.generate(
+                model=Config.SMALL_MODEL,
+                context="\n\n".join(c["text"] for c in chunks),
+                question=query,
+                # The prompt the router's decision would have produced, with the small model behind it
+                classification=rules.classify(query)[0],
+            )
+        except Exception as e:
+            print(f"  [{i}/{len(queries)}] ERROR {query[:60]!r}: {e}")
+            continue
+        flags = evaluator.evaluate(answer, chunks)
+        if grounding is not None and "refusal" not in flags:
+            flags += grounding.evaluate(answer, chunks)
+        if "no_context" in flags:
+            continue
+        labels[query] = 1 if FAILED_FLAGS.intersection(flags) else 0
+        print(f"  [{i}/{len(queries)}] {'complex' if labels[query] else 'simple '} {query[:60]!r} {flags}")
+    return labels
+
+
+def model_stats(logs: list) -> dict:
+    stats = {}
+    for model in (Config.SMALL_MODEL, Config.BIG_MODEL):
+        entries = [e for e in logs if e.get("model_used") == model]
+        if entries:
+            stats[model] = {
+                "latency_ms": float(np.mean([e.get("latency_ms", 0) for e in entries])),
+                "tokens": float(np.mean([e.get("tokens_input", 0) + e.get("tokens_output", 0) for e in entries])),
+                "count": len(entries),
+            }
+    return stats
+
+
+def fit_logistic(x: np.ndarray, y: np.ndarray, l2: float, epochs: int, lr: float):
+    """Class-balanced logistic regression by full-batch gradient descent on standardized features."""
+    mean = x.mean(axis=0)
+    scale = x.std(axis=0)
+    scale[scale < 1e-6] = 1.0
+    xs = (x - mean) / scale
+    pos = max(y.sum(), 1.0)
+    neg = max(len(y) - y.sum(), 1.0)
+    sample_weight = np.where(y == 1, len(y) / (2 * pos), len(y) / (2 * neg))
+    weights = np.zeros(x.shape[1])
+    bias = 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(xs @ weights + bias)))
+        err = (p - y) * sample_weight
+        weights -= lr * (xs.T @ err / len(y) + l2 * weights)
+        bias -= lr * err.mean()
+    return weights, bias, mean, scale
+
+
+def predict(params, x: np.ndarray) -> np.ndarray:
+    weights, bias, mean, scale = params
+    return 1.0 / (1.0 + np.exp(-(((x - mean) / scale) @ weights + bias)))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Train the embedding router")
+    ap.add_argument("--logs", default=str(DEFAULT_LOGS), help="routing_logs.json")
+    ap.add_argument("--eval-results", default="", help="run_eval.py --json-output file")
+    ap.add_argument("--output", "-o", default=Config.ROUTER_MODEL_PATH, help="Where to write the .npz model")
+    ap.add_argument("--no-probe", action="store_true", help="Do not answer unlabelled queries with SMALL_MODEL")
+    ap.add_argument("--probe-limit", type=int, default=200, help="Most unlabelled queries to answer with SMALL_MODEL")
+    ap.add_argument("--l2", type=float, default=0.01)
+    ap.add_argument("--epochs", type=int, default=500)
+    ap.add_argument("--lr", type=float, default=0.5)
+    args = ap.parse_args()
+
+    logs = json.loads(Path(args.logs).read_text(encoding="utf-8")) if Path(args.logs).exists() else []
+    # Features are relevance scores against the default corpus, so other tenants' queries would be mislabelled;
+    # stub-LLM answers are random words, so their flags are not outcomes.
+    logs = [e for e in logs if tenant_key(e.get("tenant_id")) == DEFAULT_TENANT and e.get("llm_provider") == "groq"]
+    eval_results = json.loads(Path(args.eval_results).read_text(encoding="utf-8")) if args.eval_results else []
+    labels = load_labels(logs, eval_results)
+    retriever = RetrievalService(docs_path=str(ROOT_DIR / "clearpath_docs"))
+
+    unlabelled = list(dict.fromkeys(
+        q for q in ((e.get("query") or "").strip() for e in logs + eval_results) if q and q not in labels
+    ))
+    if unlabelled and not args.no_probe:
+        if Config.LLM_PROVIDER != "groq":
+            print(f"Error: probing needs Groq (LLM_PROVIDER={Config.LLM_PROVIDER}); pass --no-probe to skip", file=sys.stderr)
+            sys.exit(1)
+        probe = unlabelled[:args.probe_limit]
+        print(f"Answering {len(probe)} queries without an 8B outcome with {Config.SMALL_MODEL}...")
+        labels.update(probe_small(probe, retriever))
+    elif unlabelled:
+        print(f"Warning: {len(unlabelled)} queries (mostly rule-complex ones) have no 8B outcome and are left out; "
+              "the moved/savings figures below do not cover them")
+
+    if len(set(labels.values())) < 2:
+        print(f"Error: need examples of both classes, got {len(labels)} queries labelled {sorted(set(labels.values()))}", file=sys.stderr)
+        sys.exit(1)
+
+    queries = list(labels)
+    y = np.array([labels[q] for q in queries], dtype=np.float64)
+    print(f"Embedding {len(queries)} queries ({int(y.sum())} complex)...")
+    embeddings = retriever.encode(queries)
+    retrieved = retriever.search(embeddings)
+    x = np.stack([build_features(q, e, r) for q, e, r in zip(queries, embeddings, retrieved)]).astype(np.float64)
+
+    # Hold out 20% to report generalization, then fit on everything.
+    order = np.random.default_rng(0).permutation(len(queries))
+    split = max(1, len(queries) // 5)
+    test, train = order[:split], order[split:]
+    if len(set(y[train])) == 2:
+        holdout = predict(fit_logistic(x[train], y[train], args.l2, args.epochs, args.lr), x[test]) >= Config.ROUTER_COMPLEX_THRESHOLD
+        print(f"Holdout accuracy: {np.mean(holdout == y[test]):.3f} on {len(test)} queries")
+
+    weights, bias, mean, scale = fit_logistic(x, y, args.l2, args.epochs, args.lr)
+    stats = model_stats(logs)
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(output, weights=weights, bias=bias, mean=mean, scale=scale, model_stats=json.dumps(stats))
+    print(f"Model written to {output}")
+
+    router = EmbeddingRouter(model_path=str(output))
+    rules = RuleBasedRouter()
+    latency_saved = tokens_saved = moved = 0
+    start = time.perf_counter()
+    decisions = [router.classify(q, e, r)[0] for q, e, r in zip(queries, embeddings, retrieved)]
+    per_call_us = (time.perf_counter() - start) / len(queries) * 1e6
+    for query, decision in zip(queries, decisions):
+        if rules.classify(query)[0] == "complex" and decision == "simple":
+            moved += 1
+            estimate = router.estimate(decision)
+            latency_saved += estimate.get("predicted_latency_saved_ms", 0)
+            tokens_saved += estimate.get("predicted_tokens_saved", 0)
+    print(f"Routing cost: {per_call_us:.1f}us per query")
+    print(f"Training accuracy: {np.mean((np.array(decisions) == 'complex') == (y == 1)):.3f}")
+    print(f"Moved from {Config.BIG_MODEL} to {Config.SMALL_MODEL}: {moved}/{len(queries)} queries")
+    # Per-model means come from different query populations (the rules sent harder queries to BIG_MODEL),
+    # so this overstates what moving these queries would save.
+    print(f"Predicted savings over these queries: {latency_saved} ms latency, {tokens_saved} tokens (upper bound)")
+
+
+if __name__ == "__main__":
+    main()
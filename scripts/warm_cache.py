@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Precompute answers for the most frequent questions so the backend serves them
+from the response cache from the first request after a deploy.
+
+Questions come from the routing logs (most frequent first, default-corpus
+queries answered by Groq only; other tenants' and stub-LLM entries are
+skipped), eval_cases.json,
+and an optional text file (one question per line). Each is answered once by
+the same router, retriever, LLM, evaluator, and grounding check the server uses
+(configured from the same env vars), and the full QueryResponses are written to
+ANSWER_STORE_DIR keyed by the index's corpus version. The server loads that file
+into CacheService once its index is ready; after the PDFs change, rerun this.
+
+Answers flagged refusal, no_context, or ungrounded are left out unless
+--keep-flagged is given: the cache would otherwise repeat them to everyone.
+
+Usage (from project root):
+  python scripts/warm_cache.py
+  python scripts/warm_cache.py --top 200 --min-count 3
+  python scripts/warm_cache.py --questions faq.txt --no-eval-cases
+  LLM_PROVIDER=stub python scripts/warm_cache.py   # offline; only loaded by stub servers
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPT_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from models import DEFAULT_TENANT, tenant_key  # noqa: E402
+
+DEFAULT_LOGS = ROOT_DIR / "backend" / "logs" / "routing_logs.json"
+DEFAULT_CASES = SCRIPT_DIR / "eval_cases.json"
+SKIP_FLAGS = {"refusal", "no_context", "ungrounded"}
+
+
+def mine_questions(logs_path: str, cases_path: str, questions_path: str, top: int, min_count: int) -> list:
+    """Canonical questions in priority order, de-duplicated the way CacheService keys them."""
+    counts = Counter()
+    originals = {}
+    if logs_path and Path(logs_path).exists():
+        for entry in json.loads(Path(logs_path).read_text(encoding="utf-8")):
+            # Answers are precomputed from the default corpus; other tenants' questions would get the wrong ones.
+            # Stub-LLM traffic is offline testing and load benchmarks, not what users ask.
+            if tenant_key(entry.get("tenant_id")) != DEFAULT_TENANT or entry.get("llm_provider") != "groq":
+                continue
+            query = (entry.get("query") or "").strip()
+            if query:
+                counts[query.lower()] += 1
+                originals.setdefault(query.lower(), query)
+    questions = [originals[q] for q, n in counts.most_common(top) if n >= min_count]
+    if cases_path:
+        questions += [c["query"] for c in json.loads(Path(cases_path).read_text(encoding="utf-8")) if c.get("query")]
+    if questions_path:
+        questions += [line.strip() for line in Path(questions_path).read_text(encoding="utf-8").splitlines()]
+
+    seen = set()
+    unique = []
+    for question in questions:
+        key = question.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(question.strip())
+    return unique
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Precompute answers for frequent questions")
+    ap.add_argument("--logs", default=str(DEFAULT_LOGS), help="routing_logs.json to mine ('' to skip)")
+    ap.add_argument("--top", type=int, default=100, help="Most frequent logged questions to take")
+    ap.add_argument("--min-count", type=int, default=2, help="Minimum times a logged question was asked")
+    ap.add_argument("--cases", default=str(DEFAULT_CASES), help="eval_cases.json")
+    ap.add_argument("--no-eval-cases", action="store_true", help="Do not include the eval cases")
+    ap.add_argument("--questions", default="", help="Text file with one extra question per line")
+    ap.add_argument("--store-dir", default="", help="Override ANSWER_STORE_DIR")
+    ap.add_argument("--keep-flagged", action="store_true", help="Also store refusal/no_context/ungrounded answers")
+    args = ap.parse_args()
+
+    questions = mine_questions(args.logs, "" if args.no_eval_cases else args.cases, args.questions, args.top, args.min_count)
+    if not questions:
+        print("Error: no questions found", file=sys.stderr)
+        sys.exit(1)
+
+    # The server's own components, so precomputed answers match what it would have returned.
+    import main as server
+    from logger import RoutingLogger
+    from models import QueryRequest
+    from services.answer_store import AnswerStore
+    from services.cache_service import CacheService
+    from services.conversation_store import ConversationStore
+    from services.query_service import QueryService
+
+    print(f"Loading index ({server.Config.EMBEDDING_MODEL})...")
+    server.retriever.load()
+    with tempfile.TemporaryDirectory() as tmp:
+        service = QueryService(
+            router=server.router,
+            retriever=server.retriever,
+            llm=server.llm_service,
+            evaluator=server.evaluator,
+            cache=CacheService(),
+            conversation_store=ConversationStore(),
+            # Precomputation is not user traffic; keep it out of the routing logs.
+            logger=RoutingLogger(log_file=str(Path(tmp) / "routing_logs.json")),
+            grounding=server.grounding,
+        )
+        answers = {}
+        start = time.perf_counter()
+        for i, question in enumerate(questions, 1):
+            try:
+                response = service.handle_query(QueryRequest(question=question))
+            except Exception as e:
+                print(f"  [{i}/{len(questions)}] ERROR {question[:60]!r}: {e}")
+                continue
+            skipped = SKIP_FLAGS.intersection(response.metadata.evaluator_flags)
+            if skipped and not args.keep_flagged:
+                print(f"  [{i}/{len(questions)}] skip  {question[:60]!r} ({', '.join(sorted(skipped))})")
+                continue
+            answers[question] = response
+            print(f"  [{i}/{len(questions)}] ok    {question[:60]!r} ({response.metadata.model_used}, {response.metadata.latency_ms} ms)")
+
+    store = AnswerStore(args.store_dir or None)
+    path = store.save(server.retriever.corpus_version, answers)
+    print(f"{len(answers)}/{len(questions)} answers for corpus {server.retriever.corpus_version} "
+          f"written to {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()